@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel
+
+from app.core.security import InvalidToken, decode_access_token
+
+bearer = HTTPBearer(auto_error=False)
+
+
+class CurrentUser(BaseModel):
+    id: str
+    name: str
+    role: str
+    restaurant_id: Optional[str] = None
+
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> CurrentUser:
+    """
+    Identity from the bearer token, verified in memory (no users lookup).
+    async so FastAPI runs it inline rather than on the threadpool.
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        claims = decode_access_token(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    return CurrentUser(id=claims["sub"], name=claims["name"], role=claims["role"], restaurant_id=claims.get("rid"))
+
+
+def require_roles(*roles: str):
+    """Dependency allowing only the given roles."""
+    async def check(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if user.role not in roles:
+            raise HTTPException(status_code=403, detail="Not allowed for this role")
+        return user
+    return check
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def menu_etag(restaurant: dict) -> str:
+    """Validator for menu reads; changes on every menu write."""
+    return f'"{restaurant["_id"]}-m{restaurant.get("menu_revision", 0)}"'
+
+
+def config_etag(restaurant: dict) -> str:
+    """Validator for the restaurant document (config and menu revision both appear in it)."""
+    return f'"{restaurant["_id"]}-c{restaurant.get("config_version", 0)}-m{restaurant.get("menu_revision", 0)}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_get(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag `response` with ETag / Cache-Control. Returns a 304 to send instead
+    when the client already holds this revision.
+    Compute the etag before reading the data: a write landing in between then
+    only costs the client one extra full response, never a stale 304.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, must-revalidate"
+    # Staff tokens pick the restaurant, so the same URL differs per token
+    response.headers["Vary"] = "Authorization"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
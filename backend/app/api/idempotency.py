@@ -0,0 +1,50 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Header, HTTPException, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.services.idempotency import idempotency_store
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+async def idempotency_key(key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)) -> Optional[str]:
+    if key is not None and not 0 < len(key) <= 255:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-255 characters")
+    return key
+
+
+def fingerprint(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def run_idempotent(db: AsyncIOMotorDatabase, key: Optional[str], scope: str, payload, response: Response,
+                         handler: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Run handler once per (scope, Idempotency-Key); repeats get the first
+    result back with an Idempotent-Replayed header instead of running again.
+    Failed requests (HTTPException or otherwise) are not kept, so they can
+    be retried with the same key. No key: just run the handler.
+    """
+    if key is None:
+        return await handler()
+    stored_key = f"{scope}:{key}"
+    request_fingerprint = fingerprint(payload)
+    record = await idempotency_store.reserve(db, stored_key, request_fingerprint)
+    if record is not None:
+        if record["fingerprint"] != request_fingerprint:
+            raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        if "response" not in record:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        response.headers[REPLAYED_HEADER] = "true"
+        return record["response"]
+    try:
+        result = await handler()
+    except BaseException:
+        await idempotency_store.release(db, stored_key)
+        raise
+    await idempotency_store.complete(db, stored_key, request_fingerprint, result)
+    return result
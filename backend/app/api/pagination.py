@@ -0,0 +1,61 @@
+import json
+from typing import Callable, List, Optional
+
+from fastapi import Query, Response
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Keyset pagination over `_id`.
+    `after` is the last `_id` of the previous page (sent back in the
+    X-Next-Cursor header); `format=ndjson` streams rows off the cursor instead
+    of building a JSON array.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+        format: str = Query("json", pattern="^(json|ndjson)$"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.ndjson = format == "ndjson"
+
+    def apply(self, query: dict) -> dict:
+        if self.after is None:
+            return query
+        return {**query, "_id": {"$gt": self.after}}
+
+
+async def fetch_page(collection: AsyncIOMotorCollection, query: dict, page: PageParams,
+                     response: Response, projection: Optional[dict] = None) -> List[dict]:
+    """One page of documents; sets X-Next-Cursor when more rows remain."""
+    cursor = collection.find(page.apply(query), projection).sort("_id", 1).limit(page.limit + 1)
+    docs = await cursor.to_list(length=page.limit + 1)
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(docs[-1]["_id"])
+    return docs
+
+
+def stream_ndjson(collection: AsyncIOMotorCollection, query: dict, page: PageParams,
+                  projection: Optional[dict] = None, transform: Optional[Callable[[dict], dict]] = None,
+                  response: Optional[Response] = None) -> StreamingResponse:
+    """
+    Serialize each document as it comes off the Motor cursor, one JSON object per line.
+    Headers already set on the injected `response` (e.g. ETag) are carried over.
+    """
+    async def lines():
+        cursor = collection.find(page.apply(query), projection).sort("_id", 1).limit(page.limit)
+        async for doc in cursor:
+            yield json.dumps(transform(doc) if transform else doc, default=str) + "\n"
+
+    headers = dict(response.headers) if response is not None else None
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import users, restaurant, sessions, staff, menu
+from app.api.routes import users, restaurant, sessions, staff, menu, kitchen
 
 api_router = APIRouter()
 api_router.include_router(users.router, prefix="/users", tags=["users"])
@@ -7,3 +7,4 @@ api_router.include_router(restaurant.router, prefix="/restaurant", tags=["restau
 api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"])
 api_router.include_router(staff.router, prefix="/staff", tags=["staff"])
 api_router.include_router(menu.router, prefix="/menu", tags=["menu"])
+api_router.include_router(kitchen.router, prefix="/kitchen", tags=["kitchen"])
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, timezone
+from app.api.auth import require_roles
+from app.api.sse import sse_stream
+from app.api.tenant import get_staff_tenant
+from app.db.mongodb import get_sessions_database
+from app.services.kitchen_queue import kitchen_queue
+
+router = APIRouter(dependencies=[Depends(require_roles("OWNER", "KITCHEN"))])
+
+@router.get("/queue")
+async def get_queue(restaurant_id: str = Depends(get_staff_tenant),
+                    db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Pending tickets, oldest first, with consolidated counts per item."""
+    queue = await kitchen_queue.get(db, restaurant_id)
+    return queue.snapshot()
+
+@router.get("/stream")
+async def stream_queue(request: Request, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Server-Sent Events feed: the queue once, then added / ready tickets with fresh counts."""
+    subscription = kitchen_queue.subscribe(restaurant_id)
+    try:
+        queue = await kitchen_queue.get(db, restaurant_id)
+    except Exception:
+        kitchen_queue.unsubscribe(restaurant_id, subscription)
+        raise
+
+    async def with_counts(changes: dict) -> dict:
+        current = await kitchen_queue.get(db, restaurant_id)
+        return {**changes, "counts": current.counts()}
+
+    return sse_stream(request, queue.snapshot(), subscription,
+                      lambda: kitchen_queue.unsubscribe(restaurant_id, subscription), with_counts)
+
+@router.post("/tickets/{ticket_id}/ready")
+async def mark_ready(ticket_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                     db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Clear a ticket off the queue: one small status flip on its line, nothing rewritten."""
+    result = await db.session_lines.update_one(
+        {"_id": ticket_id, "restaurant_id": restaurant_id, "kitchen_status": "PENDING"},
+        {"$set": {"kitchen_status": "READY", "ready_at": datetime.now(timezone.utc)}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(404, "Ticket not found or already ready")
+    kitchen_queue.publish(restaurant_id, ready=[ticket_id])
+    return {"status": "success"}
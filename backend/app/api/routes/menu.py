@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.db.mongodb import get_database
-from typing import List, Optional
-from pydantic import BaseModel, validator
+from pymongo import InsertOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.api.auth import require_roles
+from app.api.caching import conditional_get, menu_etag
+from app.api.pagination import PageParams, fetch_page, stream_ndjson
+from app.api.serialization import FastListSerializer
+from app.api.tenant import get_staff_tenant, get_tenant
+from app.core.config import settings
+from app.db.indexes import CASE_INSENSITIVE
+from app.db.mongodb import get_database, get_catalog_database
+from app.services.menu_compaction import group_tombstones
+from app.services.menu_snapshot import menu_snapshots
+from app.services.restaurant_cache import restaurant_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import AliasChoices, BaseModel, Field, ValidationError, validator
+import codecs
+import csv
+import io
+import json
 import uuid
 
 router = APIRouter()
 
+owner_only = [Depends(require_roles("OWNER"))]
+
 # ─── Schemas ────────────────────────────────────────────────────────────────
 
 class GroupCreate(BaseModel):
     title: str
     image_url: Optional[str] = None
-    restaurant_id: str = "rest_001"
 
     @validator('title')
     def title_not_empty(cls, v):
@@ -21,7 +39,7 @@ class GroupCreate(BaseModel):
         return v.strip()
 
 class GroupResponse(BaseModel):
-    id: str
+    id: str = Field(validation_alias=AliasChoices("id", "_id"))
     title: str
     image_url: Optional[str] = None
     restaurant_id: str
@@ -32,7 +50,6 @@ class ItemCreate(BaseModel):
     description: Optional[str] = None
     price: float
     image_url: Optional[str] = None
-    restaurant_id: str = "rest_001"
 
     @validator('name')
     def name_not_empty(cls, v):
@@ -54,83 +71,144 @@ class ItemUpdate(BaseModel):
     is_available: Optional[bool] = None
 
 class ItemResponse(BaseModel):
-    id: str
+    id: str = Field(validation_alias=AliasChoices("id", "_id"))
     group_id: str
     restaurant_id: str
     name: str
     description: Optional[str] = None
     price: float
     image_url: Optional[str] = None
-    is_available: bool
+    is_available: bool = True
+
+# Only the fields the response models need
+GROUP_FIELDS = {"title": 1, "image_url": 1, "restaurant_id": 1}
+ITEM_FIELDS = {"group_id": 1, "restaurant_id": 1, "name": 1, "description": 1,
+               "price": 1, "image_url": 1, "is_available": 1}
+
+group_list = FastListSerializer(GroupResponse)
+item_list = FastListSerializer(ItemResponse)
+
+def _group_response(doc: dict) -> GroupResponse:
+    return GroupResponse(
+        id=str(doc["_id"]),
+        title=doc["title"],
+        image_url=doc.get("image_url"),
+        restaurant_id=doc["restaurant_id"]
+    )
+
+def _item_response(doc: dict) -> ItemResponse:
+    return ItemResponse(
+        id=str(doc["_id"]),
+        group_id=doc["group_id"],
+        restaurant_id=doc["restaurant_id"],
+        name=doc["name"],
+        description=doc.get("description"),
+        price=doc["price"],
+        image_url=doc.get("image_url"),
+        is_available=doc.get("is_available", True)
+    )
+
+async def _not_modified(request: Request, response: Response, db: AsyncIOMotorDatabase,
+                        restaurant_id: str) -> Optional[Response]:
+    """ETag every menu read with the restaurant's menu revision (served from the config cache)."""
+    restaurant = await restaurant_cache.get(db, restaurant_id)
+    if restaurant is None:
+        return None
+    return conditional_get(request, response, menu_etag(restaurant))
+
+# ─── Snapshot ───────────────────────────────────────────────────────────────
+
+@router.get("/snapshot")
+async def get_menu_snapshot(request: Request, response: Response, restaurant_id: str = Depends(get_tenant),
+                            db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
+    """Whole customer menu in one response: groups with their available items nested."""
+    restaurant = await restaurant_cache.get(db, restaurant_id)
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    not_modified = conditional_get(request, response, menu_etag(restaurant))
+    if not_modified:
+        return not_modified
+    body = await menu_snapshots.get(db, restaurant)
+    return Response(body, media_type="application/json", headers=dict(response.headers))
 
 # ─── Group Endpoints ─────────────────────────────────────────────────────────
 
 @router.get("/groups", response_model=List[GroupResponse])
-async def get_groups(db: AsyncIOMotorDatabase = Depends(get_database)):
-    groups = []
-    async for doc in db.menu_groups.find({"restaurant_id": "rest_001"}):
-        groups.append(GroupResponse(
-            id=str(doc["_id"]),
-            title=doc["title"],
-            image_url=doc.get("image_url"),
-            restaurant_id=doc["restaurant_id"]
-        ))
-    return groups
-
-@router.post("/groups", response_model=GroupResponse, status_code=201)
-async def create_group(payload: GroupCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
-    # Check duplicate title in same restaurant
-    existing = await db.menu_groups.find_one({"restaurant_id": payload.restaurant_id, "title": {"$regex": f"^{payload.title}$", "$options": "i"}})
-    if existing:
-        raise HTTPException(status_code=409, detail=f'A group named "{payload.title}" already exists.')
+async def get_groups(request: Request, response: Response, page: PageParams = Depends(),
+                     restaurant_id: str = Depends(get_tenant),
+                     db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
+    not_modified = await _not_modified(request, response, db, restaurant_id)
+    if not_modified:
+        return not_modified
+    query: dict = {"restaurant_id": restaurant_id}
+    deleted = await group_tombstones.group_ids(db, restaurant_id)
+    if deleted:
+        query["_id"] = {"$nin": deleted}
+    if page.ndjson:
+        return stream_ndjson(db.menu_groups, query, page, GROUP_FIELDS, lambda doc: _group_response(doc).dict(), response)
+    docs = await fetch_page(db.menu_groups, query, page, response, GROUP_FIELDS)
+    if settings.FAST_JSON_RESPONSES:
+        return group_list.response(docs, response)
+    return [_group_response(doc) for doc in docs]
+
+@router.post("/groups", response_model=GroupResponse, status_code=201, dependencies=owner_only)
+async def create_group(payload: GroupCreate, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_database)):
     new_id = str(uuid.uuid4())[:8]
-    doc = {"_id": new_id, "restaurant_id": payload.restaurant_id, "title": payload.title, "image_url": payload.image_url}
-    await db.menu_groups.insert_one(doc)
-    return GroupResponse(id=new_id, title=payload.title, image_url=payload.image_url, restaurant_id=payload.restaurant_id)
-
-@router.delete("/groups/{group_id}")
-async def delete_group(group_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
-    result = await db.menu_groups.delete_one({"_id": group_id})
-    if result.deleted_count == 0:
+    doc = {"_id": new_id, "restaurant_id": restaurant_id, "title": payload.title, "image_url": payload.image_url}
+    # Case-insensitive uniqueness per restaurant is enforced by the collation index
+    try:
+        await db.menu_groups.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f'A group named "{payload.title}" already exists.')
+    await menu_snapshots.add_group(db, doc)
+    await restaurant_cache.bump_menu_revision(db, restaurant_id)
+    return GroupResponse(id=new_id, title=payload.title, image_url=payload.image_url, restaurant_id=restaurant_id)
+
+@router.delete("/groups/{group_id}", dependencies=owner_only)
+async def delete_group(group_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_database)):
+    group = await db.menu_groups.find_one({"_id": group_id, "restaurant_id": restaurant_id}, {"restaurant_id": 1})
+    if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    # Also delete all items in the group
-    await db.menu_items.delete_many({"group_id": group_id})
+    # Items are hidden from now on and swept in the background
+    await group_tombstones.bury(db, group)
+    await menu_snapshots.remove_group(db, group["restaurant_id"], group_id)
+    await restaurant_cache.bump_menu_revision(db, group["restaurant_id"])
     return {"message": "Group and all its items deleted"}
 
 # ─── Item Endpoints ──────────────────────────────────────────────────────────
 
 @router.get("/items", response_model=List[ItemResponse])
-async def get_items(group_id: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_database)):
-    query: dict = {"restaurant_id": "rest_001"}
+async def get_items(request: Request, response: Response, group_id: Optional[str] = None, page: PageParams = Depends(),
+                    restaurant_id: str = Depends(get_tenant),
+                    db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
+    not_modified = await _not_modified(request, response, db, restaurant_id)
+    if not_modified:
+        return not_modified
+    query: dict = {"restaurant_id": restaurant_id}
+    deleted = await group_tombstones.group_ids(db, restaurant_id)
+    if deleted:
+        query["group_id"] = {"$nin": deleted}
     if group_id:
-        query["group_id"] = group_id
-    items = []
-    async for doc in db.menu_items.find(query):
-        items.append(ItemResponse(
-            id=str(doc["_id"]),
-            group_id=doc["group_id"],
-            restaurant_id=doc["restaurant_id"],
-            name=doc["name"],
-            description=doc.get("description"),
-            price=doc["price"],
-            image_url=doc.get("image_url"),
-            is_available=doc.get("is_available", True)
-        ))
-    return items
-
-@router.post("/items", response_model=ItemResponse, status_code=201)
-async def create_item(payload: ItemCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
-    group = await db.menu_groups.find_one({"_id": payload.group_id})
+        query["group_id"] = {**query.get("group_id", {}), "$eq": group_id}
+    if page.ndjson:
+        return stream_ndjson(db.menu_items, query, page, ITEM_FIELDS, lambda doc: _item_response(doc).dict(), response)
+    docs = await fetch_page(db.menu_items, query, page, response, ITEM_FIELDS)
+    if settings.FAST_JSON_RESPONSES:
+        return item_list.response(docs, response)
+    return [_item_response(doc) for doc in docs]
+
+@router.post("/items", response_model=ItemResponse, status_code=201, dependencies=owner_only)
+async def create_item(payload: ItemCreate, restaurant_id: str = Depends(get_staff_tenant),
+                      db: AsyncIOMotorDatabase = Depends(get_database)):
+    group = await db.menu_groups.find_one({"_id": payload.group_id, "restaurant_id": restaurant_id}, {"_id": 1})
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    # Check duplicate name in same group
-    existing = await db.menu_items.find_one({"group_id": payload.group_id, "name": {"$regex": f"^{payload.name}$", "$options": "i"}})
-    if existing:
-        raise HTTPException(status_code=409, detail=f'"{payload.name}" already exists in this group.')
     new_id = str(uuid.uuid4())[:8]
     doc = {
         "_id": new_id,
-        "restaurant_id": payload.restaurant_id,
+        "restaurant_id": restaurant_id,
         "group_id": payload.group_id,
         "name": payload.name,
         "description": payload.description,
@@ -138,28 +216,281 @@ async def create_item(payload: ItemCreate, db: AsyncIOMotorDatabase = Depends(ge
         "image_url": payload.image_url,
         "is_available": True
     }
-    await db.menu_items.insert_one(doc)
-    return ItemResponse(id=new_id, group_id=payload.group_id, restaurant_id=payload.restaurant_id,
+    # Case-insensitive uniqueness per group is enforced by the collation index
+    try:
+        await db.menu_items.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f'"{payload.name}" already exists in this group.')
+    await menu_snapshots.put_item(db, doc)
+    await restaurant_cache.bump_menu_revision(db, restaurant_id)
+    return ItemResponse(id=new_id, group_id=payload.group_id, restaurant_id=restaurant_id,
                         name=payload.name, description=payload.description, price=payload.price,
                         image_url=payload.image_url, is_available=True)
 
-@router.put("/items/{item_id}", response_model=ItemResponse)
-async def update_item(item_id: str, payload: ItemUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
-    existing = await db.menu_items.find_one({"_id": item_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Item not found")
+@router.put("/items/{item_id}", response_model=ItemResponse, dependencies=owner_only)
+async def update_item(item_id: str, payload: ItemUpdate, restaurant_id: str = Depends(get_staff_tenant),
+                      db: AsyncIOMotorDatabase = Depends(get_database)):
     updates = {k: v for k, v in payload.dict().items() if v is not None}
+    scope = {"_id": item_id, "restaurant_id": restaurant_id}
+    if not updates:
+        updated = await db.menu_items.find_one(scope)
+    else:
+        try:
+            updated = await db.menu_items.find_one_and_update(
+                scope, {"$set": updates}, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail=f'"{updates["name"]}" already exists in this group.')
+    if not updated:
+        raise HTTPException(status_code=404, detail="Item not found")
     if updates:
-        await db.menu_items.update_one({"_id": item_id}, {"$set": updates})
-    updated = await db.menu_items.find_one({"_id": item_id})
-    return ItemResponse(id=str(updated["_id"]), group_id=updated["group_id"],
-                        restaurant_id=updated["restaurant_id"], name=updated["name"],
-                        description=updated.get("description"), price=updated["price"],
-                        image_url=updated.get("image_url"), is_available=updated.get("is_available", True))
-
-@router.delete("/items/{item_id}")
-async def delete_item(item_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
-    result = await db.menu_items.delete_one({"_id": item_id})
-    if result.deleted_count == 0:
+        await menu_snapshots.put_item(db, updated)
+        await restaurant_cache.bump_menu_revision(db, updated["restaurant_id"])
+    return _item_response(updated)
+
+@router.delete("/items/{item_id}", dependencies=owner_only)
+async def delete_item(item_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                      db: AsyncIOMotorDatabase = Depends(get_database)):
+    deleted = await db.menu_items.find_one_and_delete({"_id": item_id, "restaurant_id": restaurant_id},
+                                                      projection={"restaurant_id": 1, "group_id": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Item not found")
+    await menu_snapshots.remove_item(db, deleted)
+    await restaurant_cache.bump_menu_revision(db, deleted["restaurant_id"])
     return {"message": "Item deleted"}
+
+# ─── Bulk Import / Export ────────────────────────────────────────────────────
+
+EXPORT_COLUMNS = ["id", "group_id", "group", "name", "description", "price", "image_url", "is_available"]
+FALSE_VALUES = {"false", "0", "no", "n"}
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    groups_created: int
+    errors: List[ImportRowError]
+
+async def _body_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body as it arrives and yield complete lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+async def _csv_records(request: Request) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    header = None
+    row = 0
+    record = ""
+    async for line in _body_lines(request):
+        record += line
+        # A quoted field can span lines; wait for its closing quote
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            continue
+        row += 1
+        yield row, {k: (v if v != "" else None) for k, v in zip(header, values)}, None
+    if record.strip():
+        yield row + 1, None, "Unterminated quoted field"
+
+async def _ndjson_records(request: Request) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    row = 0
+    async for line in _body_lines(request):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, value, None
+
+class _GroupResolver:
+    """Group ids and titles of the restaurant, fetched once per import."""
+
+    def __init__(self, restaurant_id: str, create_missing: bool):
+        self.restaurant_id = restaurant_id
+        self.create_missing = create_missing
+        self.ids: set = set()
+        self.by_title: Dict[str, str] = {}
+        self.pending: List[dict] = []
+        self.created = 0
+
+    async def load(self, db: AsyncIOMotorDatabase):
+        async for group in db.menu_groups.find({"restaurant_id": self.restaurant_id}, {"title": 1}):
+            self.ids.add(group["_id"])
+            self.by_title[group["title"].casefold()] = group["_id"]
+
+    def resolve(self, record: dict) -> Optional[str]:
+        group_id = record.get("group_id")
+        if group_id in self.ids:
+            return group_id
+        title = (record.get("group") or "").strip()
+        if not title:
+            return None
+        group_id = self.by_title.get(title.casefold())
+        if group_id is None and self.create_missing:
+            group_id = str(uuid.uuid4())[:8]
+            self.pending.append({"_id": group_id, "restaurant_id": self.restaurant_id, "title": title, "image_url": None})
+            self.ids.add(group_id)
+            self.by_title[title.casefold()] = group_id
+        return group_id
+
+    async def flush(self, db: AsyncIOMotorDatabase) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Insert the groups this batch created. Returns ({pending id: existing id}
+        for titles another request created meanwhile, {pending id: error} for
+        groups that could not be created).
+        """
+        remapped: Dict[str, str] = {}
+        rejected: Dict[str, str] = {}
+        if not self.pending:
+            return remapped, rejected
+        groups, self.pending = self.pending, []
+        try:
+            await db.menu_groups.insert_many(groups, ordered=False)
+            self.created += len(groups)
+            return remapped, rejected
+        except BulkWriteError as e:
+            self.created += e.details["nInserted"]
+            failures = e.details["writeErrors"]
+        for failure in failures:
+            group = groups[failure["index"]]
+            title = group["title"]
+            self.ids.discard(group["_id"])
+            existing = None
+            if failure["code"] == 11000:
+                # Same title created concurrently (another import or POST /groups): use that group
+                existing = await db.menu_groups.find_one({"restaurant_id": self.restaurant_id, "title": title},
+                                                         {"_id": 1}, collation=CASE_INSENSITIVE)
+            if existing:
+                remapped[group["_id"]] = existing["_id"]
+                self.ids.add(existing["_id"])
+                self.by_title[title.casefold()] = existing["_id"]
+            else:
+                rejected[group["_id"]] = f'Group "{title}" could not be created: {failure["errmsg"]}'
+                self.by_title.pop(title.casefold(), None)
+        return remapped, rejected
+
+async def _write_batch(db: AsyncIOMotorDatabase, groups: _GroupResolver, batch: List[Tuple[int, dict]],
+                       errors: List[ImportRowError]) -> int:
+    remapped, rejected = await groups.flush(db)
+    if remapped or rejected:
+        kept = []
+        for row, doc in batch:
+            if doc["group_id"] in rejected:
+                errors.append(ImportRowError(row=row, error=rejected[doc["group_id"]]))
+                continue
+            doc["group_id"] = remapped.get(doc["group_id"], doc["group_id"])
+            kept.append((row, doc))
+        batch = kept
+        if not batch:
+            return 0
+    try:
+        result = await db.menu_items.bulk_write([InsertOne(doc) for _, doc in batch], ordered=False)
+        return result.inserted_count
+    except BulkWriteError as e:
+        for failure in e.details["writeErrors"]:
+            row, doc = batch[failure["index"]]
+            message = (f'"{doc["name"]}" already exists in this group.' if failure["code"] == 11000
+                       else failure["errmsg"])
+            errors.append(ImportRowError(row=row, error=message))
+        return e.details["nInserted"]
+
+@router.post("/items/import", response_model=ImportResult, dependencies=owner_only)
+async def import_items(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    create_groups: bool = Query(False, description="Create groups named in the `group` column that do not exist yet"),
+    restaurant_id: str = Depends(get_staff_tenant),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Bulk-create menu items from a streamed CSV (header row) or NDJSON body.
+    Columns / keys: `group_id` or `group` (title), name, description, price,
+    image_url, is_available. Rows are validated like POST /items and written
+    with bulk_write in MENU_IMPORT_BATCH_SIZE batches; bad rows are reported
+    by number and never stop the import.
+    """
+    groups = _GroupResolver(restaurant_id, create_groups)
+    await groups.load(db)
+    records = _csv_records(request) if format == "csv" else _ndjson_records(request)
+    errors: List[ImportRowError] = []
+    batch: List[Tuple[int, dict]] = []
+    imported = 0
+
+    async for row, record, error in records:
+        if error:
+            errors.append(ImportRowError(row=row, error=error))
+            continue
+        group_id = groups.resolve(record)
+        if group_id is None:
+            errors.append(ImportRowError(row=row, error="Group not found"))
+            continue
+        try:
+            item = ItemCreate(**{**record, "group_id": group_id})
+        except ValidationError as e:
+            errors.append(ImportRowError(row=row, error="; ".join(err["msg"] for err in e.errors())))
+            continue
+        available = str(record.get("is_available", True)).strip().lower() not in FALSE_VALUES
+        batch.append((row, {"_id": str(uuid.uuid4())[:8], **item.dict(), "restaurant_id": restaurant_id,
+                            "is_available": available}))
+        if len(batch) >= settings.MENU_IMPORT_BATCH_SIZE:
+            imported += await _write_batch(db, groups, batch, errors)
+            batch = []
+    if batch:
+        imported += await _write_batch(db, groups, batch, errors)
+
+    if imported or groups.created:
+        # One revision for the whole import; the menu snapshot rebuilds on its next read
+        await restaurant_cache.bump_menu_revision(db, restaurant_id)
+    errors.sort(key=lambda e: e.row)
+    return ImportResult(imported=imported, failed=len(errors), groups_created=groups.created, errors=errors)
+
+@router.get("/items/export", dependencies=owner_only)
+async def export_items(format: str = Query("csv", pattern="^(csv|ndjson)$"),
+                       restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
+    """Stream every menu item (in the import format) straight off the cursor."""
+    titles = {g["_id"]: g["title"] async for g in db.menu_groups.find({"restaurant_id": restaurant_id}, {"title": 1})}
+    query = {"restaurant_id": restaurant_id, "group_id": {"$in": list(titles)}}
+
+    async def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+        async for doc in db.menu_items.find(query, ITEM_FIELDS).sort("_id", 1):
+            row = {"id": doc["_id"], "group_id": doc["group_id"], "group": titles.get(doc["group_id"]),
+                   "name": doc["name"], "description": doc.get("description"), "price": doc["price"],
+                   "image_url": doc.get("image_url"), "is_available": doc.get("is_available", True)}
+            if format == "ndjson":
+                buffer.write(json.dumps(row) + "\n")
+            else:
+                writer.writerow(["" if row[c] is None else row[c] for c in EXPORT_COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(rows(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="menu.{format}"'})
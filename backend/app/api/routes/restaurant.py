@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.db.mongodb import get_database
+from pymongo import ReturnDocument
+from app.api.auth import require_roles
+from app.api.caching import config_etag, conditional_get, menu_etag
+from app.api.pagination import PageParams, fetch_page, stream_ndjson
+from app.api.tenant import get_staff_tenant, get_tenant
+from app.db.mongodb import get_database, get_catalog_database
+from app.services.floor_map import floor_maps
+from app.services.menu_compaction import group_tombstones
+from app.services.restaurant_cache import restaurant_cache
+from app.services.revenue_rollups import revenue_rollups
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 router = APIRouter()
 
 @router.get("/config")
-async def get_restaurant_config(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_restaurant_config(request: Request, response: Response, restaurant_id: str = Depends(get_tenant),
+                                db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
     """Fetch restaurant gamification config (for owner/public view)."""
-    # Simply fetching the first seeded restaurant
-    restaurant = await db.restaurants.find_one({"_id": "rest_001"})
+    restaurant = await restaurant_cache.get(db, restaurant_id)
     
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-        
+
+    not_modified = conditional_get(request, response, config_etag(restaurant))
+    if not_modified:
+        return not_modified
     return restaurant
 
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from app.models.schemas import SpinnerSlot
 
 class UpdateConfigReq(BaseModel):
@@ -25,27 +38,79 @@ class UpdateConfigReq(BaseModel):
     game_unlock_increment: Optional[float] = None
     spinner_slots: List[SpinnerSlot]
 
-@router.put("/config")
-async def update_restaurant_config(req: UpdateConfigReq, db: AsyncIOMotorDatabase = Depends(get_database)):
+    @validator('spinner_slots')
+    def probabilities_sum_to_100(cls, v):
+        if not v:
+            raise ValueError('Spinner needs at least one slot')
+        if any(slot.probability < 0 for slot in v):
+            raise ValueError('Slot probabilities cannot be negative')
+        if abs(sum(slot.probability for slot in v) - 100.0) > 1e-6:
+            raise ValueError('Slot probabilities must add up to 100')
+        return v
+
+@router.put("/config", dependencies=[Depends(require_roles("OWNER"))])
+async def update_restaurant_config(req: UpdateConfigReq, restaurant_id: str = Depends(get_staff_tenant),
+                                   db: AsyncIOMotorDatabase = Depends(get_database)):
     update_data = req.dict(exclude_unset=True)
-    res = await db.restaurants.update_one(
-        {"_id": "rest_001"},
-        {"$set": update_data}
+    # Bump the config version so cached copies in every worker can be ordered
+    restaurant = await db.restaurants.find_one_and_update(
+        {"_id": restaurant_id},
+        {"$set": update_data, "$inc": {"config_version": 1}},
+        return_document=ReturnDocument.AFTER
     )
-    if res.matched_count == 0:
+    if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    restaurant_cache.put(restaurant)
+    restaurant_cache.announce(restaurant_id)
     return {"status": "success"}
 
+MENU_FIELDS = {"group_id": 1, "name": 1, "description": 1, "price": 1, "image_url": 1}
+TABLE_FIELDS = {"table_number": 1, "qr_code_id": 1, "current_session_id": 1}
+
 @router.get("/menu")
-async def get_menu(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_menu(request: Request, response: Response, page: PageParams = Depends(),
+                   restaurant_id: str = Depends(get_tenant),
+                   db: AsyncIOMotorDatabase = Depends(get_catalog_database)):
     """Fetch all available menu items."""
-    cursor = db.menu_items.find({"restaurant_id": "rest_001", "is_available": True})
-    items = await cursor.to_list(length=100)
-    return items
+    restaurant = await restaurant_cache.get(db, restaurant_id)
+    if restaurant:
+        not_modified = conditional_get(request, response, menu_etag(restaurant))
+        if not_modified:
+            return not_modified
+    query: dict = {"restaurant_id": restaurant_id, "is_available": True}
+    deleted = await group_tombstones.group_ids(db, restaurant_id)
+    if deleted:
+        query["group_id"] = {"$nin": deleted}
+    if page.ndjson:
+        return stream_ndjson(db.menu_items, query, page, MENU_FIELDS, response=response)
+    return await fetch_page(db.menu_items, query, page, response, MENU_FIELDS)
 
-@router.get("/tables")
-async def get_tables(db: AsyncIOMotorDatabase = Depends(get_database)):
+@router.get("/tables", dependencies=[Depends(require_roles("OWNER", "SERVER"))])
+async def get_tables(response: Response, page: PageParams = Depends(), restaurant_id: str = Depends(get_staff_tenant),
+                     db: AsyncIOMotorDatabase = Depends(get_database)):
     """Fetch all tables with session context."""
-    cursor = db.tables.find({"restaurant_id": "rest_001"})
-    tables = await cursor.to_list(length=100)
-    return tables
+    query = {"restaurant_id": restaurant_id}
+    if page.ndjson:
+        return stream_ndjson(db.tables, query, page, TABLE_FIELDS)
+    return await fetch_page(db.tables, query, page, response, TABLE_FIELDS)
+
+@router.get("/floor", dependencies=[Depends(require_roles("OWNER", "SERVER"))])
+async def get_floor(restaurant_id: str = Depends(get_staff_tenant), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Every table with its open session's total, game status, item count and age, in one call."""
+    floor = await floor_maps.get(db, restaurant_id)
+    return floor.render()
+
+# Default dashboard window per bucket size
+DASHBOARD_WINDOWS = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+
+@router.get("/revenue", dependencies=[Depends(require_roles("OWNER"))])
+async def get_revenue(period: str = Query("day", pattern="^(hour|day)$"), start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, restaurant_id: str = Depends(get_staff_tenant),
+                      db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Revenue per UTC hour / day bucket, with item and server totals, from the rollups."""
+    # Naive times are taken as UTC, like the buckets
+    end = end.replace(tzinfo=end.tzinfo or timezone.utc) if end else datetime.now(timezone.utc)
+    start = start.replace(tzinfo=start.tzinfo or timezone.utc) if start else end - DASHBOARD_WINDOWS[period]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return await revenue_rollups.dashboard(db, restaurant_id, period, start, end)
@@ -1,87 +1,310 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.db.mongodb import get_database
-from typing import List, Dict
-import random
+from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
+from app.api.auth import CurrentUser, require_roles
+from app.api.idempotency import idempotency_key, run_idempotent
+from app.api.pagination import PageParams, fetch_page, stream_ndjson
+from app.api.sse import sse_stream
+from app.api.tenant import get_staff_tenant
+from app.db.mongodb import get_sessions_database
+from app.models.schemas import SessionLine
+from app.services.kitchen_queue import kitchen_queue, ticket_from_line
+from app.services.restaurant_cache import restaurant_cache
+from app.services.revenue_rollups import revenue_rollups
+from app.services.session_events import session_hub
+from bson import ObjectId
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
 
 router = APIRouter()
 
-@router.get("/")
-async def get_sessions(db: AsyncIOMotorDatabase = Depends(get_database)):
+# Fields pushed to customer screens over the session stream
+STREAM_FIELDS = {"game_status": 1, "total_amount": 1, "reward_won": 1}
+# Summary polled by customer / server screens: running aggregates, never the line list
+SUMMARY_FIELDS = {"restaurant_id": 1, "table_id": 1, "server_id": 1, "item_counts": 1, "line_count": 1,
+                  "total_amount": 1, "game_status": 1, "reward_won": 1, "status": 1, "created_at": 1,
+                  "discount_amount": 1, "payable_amount": 1, "billed_at": 1, "closed_at": 1}
+# Fields the billing / server session list renders
+LIST_FIELDS = {"table_id": 1, "server_id": 1, "item_counts": 1, "line_count": 1, "total_amount": 1,
+               "game_status": 1, "reward_won": 1, "status": 1, "created_at": 1}
+LINE_FIELDS = {"session_id": 0, "restaurant_id": 0, "batch": 0}
+# Recent add-items batches remembered on the session, for retries that failed part-way
+APPLIED_BATCHES_KEPT = 50
+
+class AddItemLine(BaseModel):
+    menu_item_id: str
+    quantity: int = Field(..., gt=0)
+    notes: Optional[str] = None
+
+class AddItemsReq(BaseModel):
+    items: List[AddItemLine] = Field(..., min_length=1)
+
+@router.get("/", dependencies=[Depends(require_roles("OWNER", "SERVER"))])
+async def get_sessions(response: Response, page: PageParams = Depends(), restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
     """Fetch all open sessions (Billing & Server use)"""
-    cursor = db.dining_sessions.find({"restaurant_id": "rest_001", "status": "OPEN"})
-    sessions = await cursor.to_list(length=100)
-    return sessions
+    query = {"restaurant_id": restaurant_id, "status": "OPEN"}
+    if page.ndjson:
+        return stream_ndjson(db.dining_sessions, query, page, LIST_FIELDS)
+    return await fetch_page(db.dining_sessions, query, page, response, LIST_FIELDS)
 
 @router.get("/{session_id}")
-async def get_session(session_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
-    session = await db.dining_sessions.find_one({"_id": session_id})
+async def get_session(session_id: str, db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    session = await db.dining_sessions.find_one({"_id": session_id}, SUMMARY_FIELDS)
     if not session:
         raise HTTPException(404, "Session not found")
     return session
 
+@router.get("/{session_id}/lines")
+async def get_session_lines(session_id: str, response: Response, page: PageParams = Depends(),
+                            db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Every order line of a session, oldest first (fetched on demand, not polled)."""
+    query = {"session_id": session_id}
+    if page.ndjson:
+        return stream_ndjson(db.session_lines, query, page, LINE_FIELDS)
+    return await fetch_page(db.session_lines, query, page, response, LINE_FIELDS)
+
+@router.get("/{session_id}/stream")
+async def stream_session(session_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Server-Sent Events feed of game_status / total_amount / reward_won changes."""
+    # Subscribe before reading, so a change published in between is delivered, not lost
+    subscription = session_hub.subscribe(session_id)
+    try:
+        session = await db.dining_sessions.find_one({"_id": session_id}, STREAM_FIELDS)
+    except Exception:
+        session_hub.unsubscribe(session_id, subscription)
+        raise
+    if not session:
+        session_hub.unsubscribe(session_id, subscription)
+        raise HTTPException(404, "Session not found")
+
+    # Initial snapshot, then only the fields that change
+    return sse_stream(request, {k: v for k, v in session.items() if k != "_id"}, subscription,
+                      lambda: session_hub.unsubscribe(session_id, subscription))
+
 @router.post("/{session_id}/add-items")
-async def add_session_items(session_id: str, data: dict = Body(...), db: AsyncIOMotorDatabase = Depends(get_database)):
+async def add_session_items(session_id: str, req: AddItemsReq, response: Response,
+                            user: CurrentUser = Depends(require_roles("OWNER", "SERVER")),
+                            restaurant_id: str = Depends(get_staff_tenant),
+                            key: Optional[str] = Depends(idempotency_key),
+                            db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
     """Server adds items to session and checks if game unlocks"""
-    session = await db.dining_sessions.find_one({"_id": session_id})
-    restaurant = await db.restaurants.find_one({"_id": session["restaurant_id"]})
-    
-    new_total = session["total_amount"] + sum([item["price_per_item"] * item["quantity"] for item in data["items"]])
-    game_status = session["game_status"]
-    
-    # Auto unlock if over threshold and previously locked
-    if new_total >= restaurant["game_unlock_threshold"] and game_status == "LOCKED":
-        game_status = "UNLOCKED"
-        
-    await db.dining_sessions.update_one(
-        {"_id": session_id},
-        {
-            "$set": {
-                "total_amount": new_total,
-                "game_status": game_status
-            },
-            "$push": {"items": {"$each": data["items"]}}
-        }
+    return await run_idempotent(db, key, f"add-items:{session_id}", req.dict(), response,
+                                lambda: _add_session_items(session_id, req, user, restaurant_id, key, db))
+
+async def _add_session_items(session_id: str, req: AddItemsReq, user: CurrentUser, restaurant_id: str,
+                             key: Optional[str], db: AsyncIOMotorDatabase) -> dict:
+    # Price lines from this restaurant's menu, never from the client
+    item_ids = list({line.menu_item_id for line in req.items})
+    menu = {}
+    async for doc in db.menu_items.find(
+        {"_id": {"$in": item_ids}, "restaurant_id": restaurant_id, "is_available": True},
+        {"name": 1, "price": 1}
+    ):
+        menu[doc["_id"]] = doc
+    missing = [item_id for item_id in item_ids if item_id not in menu]
+    if missing:
+        raise HTTPException(400, f"Unknown or unavailable menu items: {', '.join(missing)}")
+
+    restaurant = await restaurant_cache.get(db, restaurant_id)
+    if not restaurant:
+        raise HTTPException(404, "Restaurant not found")
+
+    added = sum(menu[line.menu_item_id]["price"] * line.quantity for line in req.items)
+    counts: Dict[str, int] = {}
+    for line in req.items:
+        counts[line.menu_item_id] = counts.get(line.menu_item_id, 0) + line.quantity
+    new_total = {"$add": [{"$ifNull": ["$total_amount", 0]}, added]}
+
+    # One pipeline update: aggregates, the batch marker and the unlock on the
+    # post-increment total, so no read-then-write between them. The batch
+    # marker lets a retry of the same Idempotency-Key skip the counting and
+    # write only the lines the failed attempt did not.
+    batch = f"key:{key}" if key else str(ObjectId())  # never starts with "$", so safe as a pipeline literal
+    session = await db.dining_sessions.find_one_and_update(
+        {"_id": session_id, "restaurant_id": restaurant_id, "status": "OPEN", "applied_batches": {"$ne": batch}},
+        [{"$set": {
+            "total_amount": new_total,
+            "line_count": {"$add": [{"$ifNull": ["$line_count", 0]}, len(req.items)]},
+            **{f"item_counts.{item_id}": {"$add": [{"$ifNull": [f"$item_counts.{item_id}", 0]}, quantity]}
+               for item_id, quantity in counts.items()},
+            "game_status": {"$cond": [
+                {"$and": [{"$eq": ["$game_status", "LOCKED"]},
+                          {"$gte": [new_total, restaurant["game_unlock_threshold"]]}]},
+                "UNLOCKED", "$game_status"
+            ]},
+            "applied_batches": {"$slice": [
+                {"$concatArrays": [{"$ifNull": ["$applied_batches", []]}, [batch]]},
+                -APPLIED_BATCHES_KEPT
+            ]},
+        }}],
+        projection=SUMMARY_FIELDS,
+        return_document=ReturnDocument.AFTER
     )
-    return await db.dining_sessions.find_one({"_id": session_id})
+    written = 0
+    if not session:
+        session = await db.dining_sessions.find_one({"_id": session_id, "restaurant_id": restaurant_id,
+                                                     "applied_batches": batch}, SUMMARY_FIELDS)
+        if not session:
+            raise HTTPException(404, "Session not found or not open")
+        # Retry of a request whose update landed before it failed. Lines are
+        # inserted in order, so the ones it already wrote are a prefix.
+        written = await db.session_lines.count_documents({"session_id": session_id, "batch": batch})
+        if written >= len(req.items):
+            return session
+
+    # Table and server come from the update's result rather than a read before it
+    lines = [
+        SessionLine(
+            _id=str(ObjectId()),  # string ids that sort by time, for keyset paging
+            session_id=session_id,
+            restaurant_id=restaurant_id,
+            table_id=session["table_id"],
+            server_id=session["server_id"],
+            added_by=user.id,
+            batch=batch,
+            menu_item_id=line.menu_item_id,
+            name=menu[line.menu_item_id]["name"],
+            quantity=line.quantity,
+            price_per_item=menu[line.menu_item_id]["price"],
+            notes=line.notes
+        ).dict(by_alias=True)
+        for line in req.items[written:]
+    ]
+    await db.session_lines.insert_many(lines)
+
+    await revenue_rollups.record_order(db, restaurant_id, lines)
+    kitchen_queue.publish(restaurant_id, added=[ticket_from_line(line) for line in lines])
+    session_hub.publish(session_id, {"total_amount": session["total_amount"], "game_status": session["game_status"],
+                                     "item_count": sum(session["item_counts"].values())})
+    return session
 
 @router.post("/{session_id}/game-won")
-async def game_won(session_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def game_won(session_id: str, response: Response, key: Optional[str] = Depends(idempotency_key),
+                   db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
     """Customer finishes puzzle"""
+    return await run_idempotent(db, key, f"game-won:{session_id}", None, response,
+                                lambda: _game_won(session_id, db))
+
+async def _require_open(db: AsyncIOMotorDatabase, session_id: str):
+    """409 when a game update missed because the session is billed or closed."""
+    session = await db.dining_sessions.find_one({"_id": session_id}, {"status": 1})
+    if session and session["status"] != "OPEN":
+        raise HTTPException(409, f"Session is already {session['status']}")
+
+async def _game_won(session_id: str, db: AsyncIOMotorDatabase) -> dict:
     result = await db.dining_sessions.update_one(
-        {"_id": session_id, "game_status": "UNLOCKED"},
+        {"_id": session_id, "status": "OPEN", "game_status": "UNLOCKED"},
         {"$set": {"game_status": "WON"}}
     )
     if result.modified_count == 0:
+        await _require_open(db, session_id)
         raise HTTPException(400, "Game is not unlocked or doesn't exist.")
+    session_hub.publish(session_id, {"game_status": "WON"})
     return {"message": "Game Won! You can now spin."}
     
 @router.post("/{session_id}/spin")
-async def spin_wheel(session_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def spin_wheel(session_id: str, response: Response, key: Optional[str] = Depends(idempotency_key),
+                     db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
     """Customer spins wheel based on probabilities"""
-    session = await db.dining_sessions.find_one({"_id": session_id})
+    return await run_idempotent(db, key, f"spin:{session_id}", None, response,
+                                lambda: _spin_wheel(session_id, db))
+
+async def _spin_wheel(session_id: str, db: AsyncIOMotorDatabase) -> dict:
+    # Fast-fail and the restaurant to draw from; the update below is what admits the spin
+    session = await db.dining_sessions.find_one({"_id": session_id},
+                                                {"restaurant_id": 1, "status": 1, "game_status": 1, "reward_won": 1})
+    if session and session["status"] != "OPEN":
+        # Billed: the payable amount is frozen, so a reward could no longer apply
+        raise HTTPException(409, f"Session is already {session['status']}")
     if not session or session["game_status"] != "WON" or session.get("reward_won"):
         raise HTTPException(400, "Cannot spin. Must win game first and have no previous reward.")
         
-    restaurant = await db.restaurants.find_one({"_id": session["restaurant_id"]})
-    slots = restaurant["spinner_slots"]
-    
-    rand = random.uniform(0, 100)
-    cumulative = 0.0
-    won_slot = None
-    
-    for slot in slots:
-        cumulative += slot["probability"]
-        if rand <= cumulative:
-            won_slot = slot
-            break
-            
-    if not won_slot:
-        won_slot = slots[-1] # Fallback to last item due to floating errors
-        
-    await db.dining_sessions.update_one(
-        {"_id": session_id},
-        {"$set": {"reward_won": won_slot["reward"]}}
+    restaurant = await restaurant_cache.get(db, session["restaurant_id"])
+    if not restaurant or not restaurant.get("spinner_slots"):
+        raise HTTPException(400, "Spinner is not configured for this restaurant.")
+    won_slot = restaurant_cache.sampler_for(restaurant).draw()
+
+    # WON -> SPUN consumes the spin even when the slot has no reward, so of
+    # concurrent taps or keyless retries exactly one draw is kept. Sessions
+    # spun before SPUN existed are still WON but hold their reward.
+    spun = await db.dining_sessions.find_one_and_update(
+        {"_id": session_id, "status": "OPEN", "game_status": "WON", "reward_won": None},
+        {"$set": {"game_status": "SPUN", "reward_won": won_slot["reward"], "spun_at": datetime.now(timezone.utc)}},
+        projection={"_id": 1}
     )
+    if not spun:
+        await _require_open(db, session_id)
+        raise HTTPException(400, "Cannot spin. Must win game first and have no previous reward.")
+    session_hub.publish(session_id, {"game_status": "SPUN", "reward_won": won_slot["reward"]})
     
     return {"won_slot": won_slot}
+
+async def _reward_discount(db: AsyncIOMotorDatabase, session: dict) -> float:
+    """Amount reward_won takes off the session total."""
+    reward = session.get("reward_won")
+    total = session["total_amount"]
+    if not reward:
+        return 0.0
+    if reward["offer_type"] == "PERCENTAGE_DISCOUNT":
+        return round(total * min(reward["value"], 100) / 100, 2)
+    if reward["offer_type"] == "FLAT_DISCOUNT":
+        return min(reward["value"], total)
+    # FREE_ITEM: one of that item comes off the bill if it was ordered
+    line = await db.session_lines.find_one({"session_id": session["_id"], "name": reward.get("item_name")},
+                                           {"price_per_item": 1})
+    return min(line["price_per_item"], total) if line else 0.0
+
+@router.post("/{session_id}/bill", dependencies=[Depends(require_roles("OWNER", "SERVER", "BILLING"))])
+async def bill_session(session_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Apply the spin reward to the total and stop taking orders on the session."""
+    session = await db.dining_sessions.find_one({"_id": session_id, "restaurant_id": restaurant_id}, SUMMARY_FIELDS)
+    if not session:
+        raise HTTPException(404, "Session not found")
+    if session["status"] != "OPEN":
+        raise HTTPException(400, f"Session is already {session['status']}")
+    discount = await _reward_discount(db, session)
+    bill = {
+        "status": "BILLED",
+        "discount_amount": discount,
+        "payable_amount": round(session["total_amount"] - discount, 2),
+        "billed_at": datetime.now(timezone.utc),
+    }
+    # Only bill the total and reward that were read; an add-items or spin in between retries
+    session = await db.dining_sessions.find_one_and_update(
+        {"_id": session_id, "status": "OPEN", "total_amount": session["total_amount"],
+         "reward_won": session.get("reward_won")},
+        {"$set": bill},
+        projection=SUMMARY_FIELDS,
+        return_document=ReturnDocument.AFTER
+    )
+    if not session:
+        raise HTTPException(409, "Session changed while billing, please retry")
+    session_hub.publish(session_id, {"status": "BILLED", "payable_amount": bill["payable_amount"]})
+    return session
+
+@router.post("/{session_id}/close", dependencies=[Depends(require_roles("OWNER", "SERVER", "BILLING"))])
+async def close_session(session_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                        db: AsyncIOMotorDatabase = Depends(get_sessions_database)):
+    """Mark a billed session paid and free its table. The archiver moves it out later."""
+    session = await db.dining_sessions.find_one_and_update(
+        {"_id": session_id, "restaurant_id": restaurant_id, "status": "BILLED"},
+        {"$set": {"status": "CLOSED", "closed_at": datetime.now(timezone.utc)}},
+        projection=SUMMARY_FIELDS,
+        return_document=ReturnDocument.AFTER
+    )
+    if not session:
+        raise HTTPException(400, "Session is not billed or doesn't exist.")
+    await revenue_rollups.record_close(db, session)
+    await db.tables.update_one({"_id": session["table_id"], "current_session_id": session_id},
+                               {"$set": {"current_session_id": None}})
+    # Anything the kitchen still shows for this table is done
+    pending = [line["_id"] async for line in
+               db.session_lines.find({"session_id": session_id, "kitchen_status": "PENDING"}, {"_id": 1})]
+    if pending:
+        await db.session_lines.update_many({"_id": {"$in": pending}}, {"$set": {"kitchen_status": "READY"}})
+        kitchen_queue.publish(restaurant_id, ready=pending)
+    session_hub.publish(session_id, {"status": "CLOSED"})
+    return session
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from app.api.auth import require_roles
+from app.api.tenant import get_staff_tenant
+from app.api.pagination import PageParams, fetch_page, stream_ndjson
+from app.api.serialization import FastListSerializer
+from app.core.config import settings
+from app.core.security import unusable_password
 from app.db.mongodb import get_database
+from app.services.user_service import login_cache
 from typing import List, Optional
-from pydantic import BaseModel, validator
+from pydantic import AliasChoices, BaseModel, Field, validator
 import re
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_roles("OWNER"))])
 
 MOBILE_REGEX = re.compile(r'^[6-9]\d{9}$')
 
 class StaffResponse(BaseModel):
-    id: str
+    id: str = Field(validation_alias=AliasChoices("id", "_id"))
     name: str
     mobile: str
     role: str
@@ -20,7 +28,6 @@ class StaffCreate(BaseModel):
     name: str
     mobile: str
     role: str  # "KITCHEN" or "SERVER"
-    restaurant_id: str = "rest_001"
 
     @validator('name')
     def name_not_empty(cls, v):
@@ -65,25 +72,43 @@ class StaffUpdate(BaseModel):
         return v
 
 
+STAFF_FIELDS = {"name": 1, "mobile": 1, "role": 1}
+staff_list = FastListSerializer(StaffResponse)
+
+def _staff_response(doc: dict) -> StaffResponse:
+    return StaffResponse(
+        id=str(doc.get("_id", "")),
+        name=doc["name"],
+        mobile=doc["mobile"],
+        role=doc["role"],
+        status="online"
+    )
+
+
 @router.get("/", response_model=List[StaffResponse])
-async def get_all_staff(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_all_staff(response: Response, page: PageParams = Depends(), restaurant_id: str = Depends(get_staff_tenant),
+                        db: AsyncIOMotorDatabase = Depends(get_database)):
     """Fetch all kitchen and server staff."""
-    staff = []
-    async for doc in db.users.find({"role": {"$in": ["KITCHEN", "SERVER"]}}):
-        staff.append(StaffResponse(
-            id=str(doc.get("_id", "")),
-            name=doc["name"],
-            mobile=doc["mobile"],
-            role=doc["role"],
-            status="online"
-        ))
-    return staff
+    query = {"restaurant_id": restaurant_id, "role": {"$in": ["KITCHEN", "SERVER"]}}
+    if page.ndjson:
+        return stream_ndjson(db.users, query, page, STAFF_FIELDS, lambda doc: _staff_response(doc).dict())
+    docs = await fetch_page(db.users, query, page, response, STAFF_FIELDS)
+    if settings.FAST_JSON_RESPONSES:
+        return staff_list.response(docs, response)
+    return [_staff_response(doc) for doc in docs]
+
+
+def _mobile_conflict(e: DuplicateKeyError) -> bool:
+    """Whether the write hit the users.mobile_unique index."""
+    key_pattern = (e.details or {}).get("keyPattern")
+    return "mobile" in key_pattern if key_pattern else "mobile" in str(e)
 
 
 @router.post("/", response_model=StaffResponse, status_code=201)
-async def create_staff(payload: StaffCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def create_staff(payload: StaffCreate, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_database)):
     """Onboard a new staff member with duplicate mobile validation."""
-    # Check duplicate mobile
+    # Check duplicate mobile (for the message; the unique index is what enforces it)
     existing = await db.users.find_one({"mobile": payload.mobile})
     if existing:
         raise HTTPException(
@@ -98,18 +123,28 @@ async def create_staff(payload: StaffCreate, db: AsyncIOMotorDatabase = Depends(
         "name": payload.name,
         "mobile": payload.mobile,
         "role": payload.role,
-        "restaurant_id": payload.restaurant_id,
-        "hashed_password": "placeholder",
+        "restaurant_id": restaurant_id,
+        "hashed_password": unusable_password(),  # no login until a password is set
         "email": f"{payload.name.lower().replace(' ', '.')}@staff.spinserve.com"
     }
-    await db.users.insert_one(doc)
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError as e:
+        if not _mobile_conflict(e):
+            raise
+        # Another request added the same mobile since the check above
+        raise HTTPException(
+            status_code=409,
+            detail=f"A staff member with mobile {payload.mobile} already exists."
+        )
     return StaffResponse(id=new_id, name=payload.name, mobile=payload.mobile, role=payload.role)
 
 
 @router.put("/{staff_id}", response_model=StaffResponse)
-async def update_staff(staff_id: str, payload: StaffUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def update_staff(staff_id: str, payload: StaffUpdate, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_database)):
     """Edit staff member details with duplicate mobile validation."""
-    existing = await db.users.find_one({"_id": staff_id})
+    existing = await db.users.find_one({"_id": staff_id, "restaurant_id": restaurant_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Staff member not found")
 
@@ -127,7 +162,16 @@ async def update_staff(staff_id: str, payload: StaffUpdate, db: AsyncIOMotorData
         updates["mobile"] = payload.mobile
 
     if updates:
-        await db.users.update_one({"_id": staff_id}, {"$set": updates})
+        try:
+            await db.users.update_one({"_id": staff_id}, {"$set": updates})
+        except DuplicateKeyError as e:
+            if not _mobile_conflict(e):
+                raise
+            raise HTTPException(
+                status_code=409,
+                detail=f"Mobile {payload.mobile} is already used by another staff member."
+            )
+        login_cache.invalidate_user(staff_id)
 
     updated = await db.users.find_one({"_id": staff_id})
     return StaffResponse(
@@ -139,9 +183,11 @@ async def update_staff(staff_id: str, payload: StaffUpdate, db: AsyncIOMotorData
 
 
 @router.delete("/{staff_id}")
-async def delete_staff(staff_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def delete_staff(staff_id: str, restaurant_id: str = Depends(get_staff_tenant),
+                       db: AsyncIOMotorDatabase = Depends(get_database)):
     """Remove a staff member from the system."""
-    result = await db.users.delete_one({"_id": staff_id})
+    result = await db.users.delete_one({"_id": staff_id, "restaurant_id": restaurant_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Staff member not found")
+    login_cache.invalidate_user(staff_id)
     return {"message": "Staff member removed successfully"}
@@ -0,0 +1,42 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+
+
+def sse_event(data: dict) -> str:
+    return f"data: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_stream(request: Request, snapshot: dict, subscription, close: Callable[[], None],
+               render: Optional[Callable[[dict], Awaitable[dict]]] = None) -> StreamingResponse:
+    """
+    Server-Sent Events response: `snapshot` first, then each batch of changes
+    from `subscription.next()` (through `render` if given), with a keepalive
+    comment when nothing happens for SESSION_STREAM_KEEPALIVE_SECONDS.
+    `close` unsubscribes; it runs however the stream ends.
+    """
+    async def events():
+        try:
+            yield sse_event(snapshot)
+            while True:
+                try:
+                    changes = await asyncio.wait_for(subscription.next(), settings.SESSION_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(await render(changes) if render else changes)
+        finally:
+            close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.auth import CurrentUser, bearer, get_current_user
+from app.core.config import settings
+from app.core.security import InvalidToken, decode_access_token
+
+
+async def get_tenant(
+    restaurant_id: Optional[str] = Query(None, description="Outlet to read; staff tokens imply their own"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+) -> str:
+    """
+    Restaurant a public read is scoped to: the caller's token if one is sent,
+    else the `restaurant_id` query parameter (customer QR links), else
+    DEFAULT_RESTAURANT_ID. Only unauthenticated callers get the default; a
+    token without a restaurant is refused.
+    """
+    if credentials is not None:
+        try:
+            rid = decode_access_token(credentials.credentials).get("rid")
+        except InvalidToken as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+        if not rid:
+            raise HTTPException(status_code=403, detail="Token is not bound to a restaurant")
+        if restaurant_id and restaurant_id != rid:
+            raise HTTPException(status_code=403, detail="Token is for another restaurant")
+        return rid
+    return restaurant_id or settings.DEFAULT_RESTAURANT_ID
+
+
+async def get_staff_tenant(user: CurrentUser = Depends(get_current_user)) -> str:
+    """Restaurant of the signed-in staff member; client-sent restaurant ids are never trusted."""
+    if not user.restaurant_id:
+        raise HTTPException(status_code=403, detail="Token is not bound to a restaurant")
+    return user.restaurant_id
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,7 +12,106 @@ class Settings(BaseSettings):
     # MongoDB Config
     MONGODB_URL: str
     DATABASE_NAME: str
+    # Fail startup if any route query's plan is a collection scan (CI / test mode)
+    CHECK_QUERY_PLANS: bool = False
+
+    # Connection pool, per worker process: size it so that
+    # workers * MONGO_MAX_POOL_SIZE stays under the server's connection limit.
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0            # also the number of connections opened at startup
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_COMPRESSORS: str = ""             # e.g. "zstd,snappy" (needs zstandard / python-snappy)
+
+    # Read preference / write concern per route class; unset = driver default.
+    # catalog: menu and restaurant config reads; sessions: dining session routes.
+    MONGO_CATALOG_READ_PREFERENCE: Optional[str] = None   # e.g. "secondaryPreferred"
+    MONGO_SESSIONS_READ_PREFERENCE: Optional[str] = None
+    MONGO_SESSIONS_WRITE_CONCERN: Optional[str] = None    # e.g. "1" or "majority"
+
+    # Session push updates (SSE)
+    SESSION_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Relay hub events between worker processes through a capped collection.
+    # The launcher turns this on whenever it starts more than one worker.
+    EVENT_RELAY_ENABLED: bool = False
+    EVENT_RELAY_SIZE_BYTES: int = 8 * 1024 * 1024
+
+    # Tenant used when a public request names no restaurant (single-outlet setups)
+    DEFAULT_RESTAURANT_ID: str = "rest_001"
+    # Per-restaurant cache partitions kept in each worker (LRU by restaurant)
+    TENANT_CACHE_MAX_TENANTS: int = 256
+
+    # Per-restaurant floor map (tables joined with live sessions) in each
+    # worker; patched from session events, fully rebuilt after this long
+    FLOOR_MAP_TTL_SECONDS: float = 30.0
+
+    # In-process restaurant config cache. Other workers drop their entry when
+    # an owner edit arrives over the event relay; the TTL bounds staleness
+    # when the relay is off or an event is missed, and for writes made
+    # outside the API (seed scripts, manual database edits).
+    RESTAURANT_CACHE_TTL_SECONDS: float = 30.0
+
+    # Password hashing (scrypt). Raising the cost rehashes each user's
+    # password on their next login.
+    PASSWORD_SCRYPT_N: int = 2 ** 14
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_HASH_WORKERS: int = 4
+    # Repeat logins with the same credentials skip the hash for this long (0 disables)
+    LOGIN_CACHE_TTL_SECONDS: float = 60.0
+
+    # Access token signing keys as "kid:secret,kid:secret". The first signs new
+    # tokens; the rest only verify, so a rotated-out key keeps working until
+    # its tokens expire. Unset: a random per-process key (single dev worker only).
+    AUTH_SECRET_KEYS: str = ""
+    AUTH_TOKEN_TTL_SECONDS: int = 8 * 60 * 60
+
+    # List endpoints (keyset pagination)
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+
+    # Rows per bulk_write batch in POST /menu/items/import
+    MENU_IMPORT_BATCH_SIZE: int = 500
+
+    # Background sweep of items left by deleted menu groups
+    MENU_COMPACTION_BATCH_SIZE: int = 500
+    MENU_COMPACTION_INTERVAL_SECONDS: float = 60.0
+
+    # Idempotency-Key results (spin, game-won, add-items) kept for replay:
+    # in Mongo for this long (TTL index), and the most recent in each worker
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_LOCAL_CACHE_SIZE: int = 10_000
+
+    # Closed sessions move to monthly archive collections after this grace period
+    SESSION_ARCHIVE_AFTER_SECONDS: float = 3600.0
+    SESSION_ARCHIVE_BATCH_SIZE: int = 500
+    SESSION_ARCHIVE_INTERVAL_SECONDS: float = 300.0
+
+    # Fixed seed for spinner draws (tests / demos). Leave unset in production.
+    SPINNER_SEED: Optional[int] = None
     
+    # max-age on ETag'd menu / config reads; 0 makes clients revalidate every time
+    # (a cheap 304 while the revision is unchanged)
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+
+    # Serialize with orjson by default and build list responses straight from
+    # Mongo documents (skips the second response_model pass). Needs orjson.
+    FAST_JSON_RESPONSES: bool = False
+
+    # Log requests slower than this (ms) with their Mongo command breakdown; unset = off
+    SLOW_REQUEST_LOG_MS: Optional[float] = None
+
+    # Production launcher (python main.py --prod)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0                 # 0 = one per CPU core
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None  # per worker; excess requests get 503
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30  # drain window after SIGTERM
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,192 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+logger = logging.getLogger("spinserve.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition shape."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class RequestStats:
+    """DB work attributed to one HTTP request (filled in by the command listener)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, str] = {}
+        self.commands: List[Tuple[str, float]] = []
+
+    def started(self, request_id: int, label: str):
+        with self._lock:
+            self._pending[request_id] = label
+
+    def finished(self, request_id: int, seconds: float, fallback: str):
+        with self._lock:
+            self.commands.append((self._pending.pop(request_id, fallback), seconds))
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.commands)
+
+
+# Motor runs driver calls on executor threads with a copy of the caller's
+# context, so the listener sees the RequestStats of the request that issued them.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("current_request", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.round_trips: Dict[Tuple[str, str], Histogram] = {}
+        self.db_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.responses: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.commands: Dict[str, int] = defaultdict(int)
+        self.command_seconds: Dict[str, float] = defaultdict(float)
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.round_trips[key] = Histogram(ROUND_TRIP_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.round_trips[key].observe(len(stats.commands))
+            self.db_seconds[key] += stats.db_seconds
+            self.responses[(method, route, status)] += 1
+
+    def record_command(self, name: str, seconds: float):
+        with self._lock:
+            self.commands[name] += 1
+            self.command_seconds[name] += seconds
+
+    def render(self, gauges: Dict[str, float]) -> str:
+        lines = []
+        with self._lock:
+            lines.append("# TYPE spinserve_http_request_duration_seconds histogram")
+            for (method, route), hist in self.latency.items():
+                lines += hist.render("spinserve_http_request_duration_seconds", f'method="{method}",route="{route}"')
+            lines.append("# TYPE spinserve_http_responses_total counter")
+            for (method, route, status), count in self.responses.items():
+                lines.append(f'spinserve_http_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines.append("# TYPE spinserve_request_db_round_trips histogram")
+            for (method, route), hist in self.round_trips.items():
+                lines += hist.render("spinserve_request_db_round_trips", f'method="{method}",route="{route}"')
+            lines.append("# TYPE spinserve_request_db_seconds_total counter")
+            for (method, route), seconds in self.db_seconds.items():
+                lines.append(f'spinserve_request_db_seconds_total{{method="{method}",route="{route}"}} {seconds}')
+            lines.append("# TYPE spinserve_mongo_commands_total counter")
+            for name, count in self.commands.items():
+                lines.append(f'spinserve_mongo_commands_total{{command="{name}"}} {count}')
+            lines.append("# TYPE spinserve_mongo_command_seconds_total counter")
+            for name, seconds in self.command_seconds.items():
+                lines.append(f'spinserve_mongo_command_seconds_total{{command="{name}"}} {seconds}')
+        for name, value in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Counts Mongo round trips and their time, globally and per request."""
+
+    def started(self, event):
+        stats = current_request.get()
+        if stats is not None:
+            stats.started(event.request_id, f"{event.command_name} {event.command.get(event.command_name, '')}")
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        seconds = event.duration_micros / 1e6
+        metrics.record_command(event.command_name, seconds)
+        stats = current_request.get()
+        if stats is not None:
+            stats.finished(event.request_id, seconds, event.command_name)
+
+
+command_metrics = CommandMetricsListener()
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency and DB round trips for every HTTP request.
+    Routes are labelled by their path template (/sessions/{session_id}/spin),
+    so the series count stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            metrics.record_request(scope["method"], route_path, status, elapsed, stats)
+            if settings.SLOW_REQUEST_LOG_MS is not None and elapsed * 1000 >= settings.SLOW_REQUEST_LOG_MS:
+                breakdown = ", ".join(f"{label} {seconds * 1000:.1f}ms" for label, seconds in stats.commands)
+                logger.warning(
+                    "Slow request %s %s %d: %.1fms total, %d DB round trips, %.1fms in DB [%s]",
+                    scope["method"], route_path, status, elapsed * 1000,
+                    len(stats.commands), stats.db_seconds * 1000, breakdown
+                )
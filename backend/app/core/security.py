@@ -0,0 +1,141 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+from app.core.config import settings
+
+SCHEME = "scrypt"
+# Stored for accounts that have no password yet (staff created by an owner);
+# never matches. "placeholder" is what such accounts used to get.
+UNUSABLE_PREFIX = "!"
+LEGACY_UNUSABLE = "placeholder"
+
+# hashlib.scrypt releases the GIL, so a small thread pool keeps the event loop
+# free during logins and caps how many hashes run at once
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+
+def hash_password(password: str) -> str:
+    """`scrypt$n$r$p$salt$hash` with the current cost parameters."""
+    n, r, p = settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+    salt = os.urandom(16)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def unusable_password() -> str:
+    """Value for `hashed_password` that no password verifies against."""
+    return UNUSABLE_PREFIX + _b64(os.urandom(16))
+
+
+def verify_password(password: str, stored: str) -> Tuple[bool, bool]:
+    """
+    Returns (matches, needs_rehash). Values without the scheme prefix are
+    legacy plaintext passwords; they verify once and are flagged for rehash,
+    as are hashes made with older cost parameters. Unusable passwords never
+    match.
+    """
+    if stored.startswith(UNUSABLE_PREFIX) or stored == LEGACY_UNUSABLE:
+        return False, False
+    if not stored.startswith(SCHEME + "$"):
+        return hmac.compare_digest(password.encode(), stored.encode()), True
+    _, n, r, p, salt, expected = stored.split("$")
+    n, r, p = int(n), int(r), int(p)
+    matches = hmac.compare_digest(_scrypt(password, base64.b64decode(salt), n, r, p), base64.b64decode(expected))
+    current = (settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P)
+    return matches, (n, r, p) != current
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str) -> Tuple[bool, bool]:
+    return await asyncio.get_running_loop().run_in_executor(_executor, verify_password, password, stored)
+
+
+# ─── Access tokens ───────────────────────────────────────────────────────────
+#
+# <kid>.<payload>.<signature>, base64url without padding, HMAC-SHA256 over
+# "<kid>.<payload>". The payload carries everything routes authorize on, so
+# no user lookup is needed per request. `kid` names the signing key: new
+# tokens use the first key in AUTH_SECRET_KEYS, and the others keep verifying
+# until they are dropped, which is how keys are rotated.
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+_ephemeral_key = os.urandom(32)
+_keyrings: Dict[str, Tuple[str, Dict[str, bytes]]] = {}
+
+
+def _keyring() -> Tuple[str, Dict[str, bytes]]:
+    """(signing kid, kid -> key), parsed once per AUTH_SECRET_KEYS value."""
+    spec = settings.AUTH_SECRET_KEYS
+    if spec not in _keyrings:
+        keys = {}
+        for entry in filter(None, (part.strip() for part in spec.split(","))):
+            kid, _, secret = entry.partition(":")
+            if not secret:
+                raise RuntimeError("AUTH_SECRET_KEYS entries must look like kid:secret")
+            keys[kid] = secret.encode()
+        if not keys:
+            print("AUTH_SECRET_KEYS is not set: using a per-process key, tokens will not survive restarts")
+            keys = {"ephemeral": _ephemeral_key}
+        _keyrings[spec] = (next(iter(keys)), keys)
+    return _keyrings[spec]
+
+
+def _sign(key: bytes, message: str) -> str:
+    return _b64url(hmac.new(key, message.encode(), hashlib.sha256).digest())
+
+
+def create_access_token(claims: dict) -> Tuple[str, int]:
+    """Signed token for `claims`; returns (token, expiry as a unix timestamp)."""
+    kid, keys = _keyring()
+    now = int(time.time())
+    expires_at = now + settings.AUTH_TOKEN_TTL_SECONDS
+    payload = _b64url(json.dumps({**claims, "iat": now, "exp": expires_at}, separators=(",", ":")).encode())
+    message = f"{kid}.{payload}"
+    return f"{message}.{_sign(keys[kid], message)}", expires_at
+
+
+def decode_access_token(token: str) -> dict:
+    try:
+        kid, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    key = _keyring()[1].get(kid)
+    if key is None:
+        raise InvalidToken("Unknown signing key")
+    if not hmac.compare_digest(_sign(key, f"{kid}.{payload}"), signature):
+        raise InvalidToken("Bad signature")
+    try:
+        claims = json.loads(_b64url_decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if claims.get("exp", 0) <= time.time():
+        raise InvalidToken("Token expired")
+    return claims
@@ -0,0 +1,142 @@
+import datetime
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+
+# "Biryani" and "biryani" compare equal under this collation
+CASE_INSENSITIVE = Collation(locale="en", strength=2)
+
+# Index manifest: every collection the API queries and the indexes its hot
+# queries need. Applied idempotently on startup and after seeding.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("mobile", ASCENDING)], name="mobile_unique", unique=True),
+        IndexModel([("restaurant_id", ASCENDING), ("role", ASCENDING), ("_id", ASCENDING)],
+                   name="restaurant_role_id"),
+    ],
+    "menu_groups": [
+        IndexModel([("restaurant_id", ASCENDING), ("_id", ASCENDING)], name="restaurant_id"),
+        IndexModel([("restaurant_id", ASCENDING), ("title", ASCENDING)], name="restaurant_title_unique_ci",
+                   unique=True, collation=CASE_INSENSITIVE),
+    ],
+    "menu_items": [
+        IndexModel([("restaurant_id", ASCENDING), ("group_id", ASCENDING), ("_id", ASCENDING)],
+                   name="restaurant_group_id"),
+        IndexModel([("restaurant_id", ASCENDING), ("is_available", ASCENDING), ("_id", ASCENDING)],
+                   name="restaurant_available_id"),
+        IndexModel([("restaurant_id", ASCENDING), ("group_id", ASCENDING), ("name", ASCENDING)],
+                   name="restaurant_group_name_unique_ci", unique=True, collation=CASE_INSENSITIVE),
+    ],
+    "menu_group_tombstones": [
+        IndexModel([("restaurant_id", ASCENDING)], name="restaurant_id"),
+    ],
+    "dining_sessions": [
+        IndexModel([("restaurant_id", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)],
+                   name="restaurant_status_id"),
+        IndexModel([("status", ASCENDING), ("closed_at", ASCENDING)], name="status_closed_at"),
+    ],
+    "session_lines": [
+        IndexModel([("session_id", ASCENDING), ("_id", ASCENDING)], name="session_id"),
+        IndexModel([("restaurant_id", ASCENDING), ("kitchen_status", ASCENDING), ("_id", ASCENDING)],
+                   name="restaurant_kitchen_status_id"),
+    ],
+    "revenue_rollups": [
+        IndexModel([("restaurant_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING)],
+                   name="restaurant_period_bucket"),
+    ],
+    "idempotency_keys": [
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl",
+                   expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    ],
+    "tables": [
+        IndexModel([("restaurant_id", ASCENDING), ("_id", ASCENDING)], name="restaurant_id"),
+    ],
+}
+
+# Representative filter/sort for each route query, checked by `find_collscans`
+ROUTE_QUERIES: List[Dict[str, Any]] = [
+    {"route": "POST /users/login", "collection": "users", "filter": {"mobile": "9999999999"}},
+    {"route": "GET /staff/", "collection": "users",
+     "filter": {"restaurant_id": "rest_001", "role": {"$in": ["KITCHEN", "SERVER"]}}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /menu/groups", "collection": "menu_groups",
+     "filter": {"restaurant_id": "rest_001"}, "sort": [("_id", ASCENDING)]},
+    {"route": "POST /menu/groups", "collection": "menu_groups",
+     "filter": {"restaurant_id": "rest_001", "title": "biryani"}, "collation": CASE_INSENSITIVE},
+    {"route": "GET /menu/items", "collection": "menu_items",
+     "filter": {"restaurant_id": "rest_001", "group_id": "mg1"}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /menu/items (all groups)", "collection": "menu_items",
+     "filter": {"restaurant_id": "rest_001"}, "sort": [("_id", ASCENDING)]},
+    {"route": "POST /menu/items", "collection": "menu_items",
+     "filter": {"restaurant_id": "rest_001", "group_id": "mg1", "name": "chicken biryani"},
+     "collation": CASE_INSENSITIVE},
+    {"route": "GET /menu/items (live groups)", "collection": "menu_items",
+     "filter": {"restaurant_id": "rest_001", "group_id": {"$nin": ["mg9"]}}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /restaurant/menu", "collection": "menu_items",
+     "filter": {"restaurant_id": "rest_001", "is_available": True}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /restaurant/tables", "collection": "tables",
+     "filter": {"restaurant_id": "rest_001"}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /sessions/", "collection": "dining_sessions",
+     "filter": {"restaurant_id": "rest_001", "status": "OPEN"}, "sort": [("_id", ASCENDING)]},
+    {"route": "GET /sessions/{id}/lines", "collection": "session_lines",
+     "filter": {"session_id": "session_001"}, "sort": [("_id", ASCENDING)]},
+    {"route": "session archiver", "collection": "dining_sessions",
+     "filter": {"status": "CLOSED", "closed_at": {"$lt": datetime.datetime(2000, 1, 1)}}, "sort": [("closed_at", ASCENDING)]},
+    {"route": "GET /restaurant/revenue", "collection": "revenue_rollups",
+     "filter": {"restaurant_id": "rest_001", "period": "day", "bucket": {"$gte": datetime.datetime(2000, 1, 1)}},
+     "sort": [("bucket", ASCENDING)]},
+    {"route": "GET /kitchen/queue", "collection": "session_lines",
+     "filter": {"restaurant_id": "rest_001", "kitchen_status": "PENDING"}, "sort": [("_id", ASCENDING)]},
+]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Create every index in the manifest. Safe to run on every start."""
+    for collection, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                if e.code in (85, 86):  # IndexOptionsConflict / IndexKeySpecsConflict
+                    # Definition changed since it was built: rebuild it
+                    await db[collection].drop_index(name)
+                    await db[collection].create_indexes([model])
+                elif model.document.get("unique"):
+                    # Duplicate protection (e.g. case-insensitive names) lives only in
+                    # these indexes: serving without one would accept duplicates silently
+                    raise RuntimeError(
+                        f"Could not build unique index {collection}.{name}: {e}. "
+                        f"Remove the duplicates it reports and restart."
+                    ) from e
+                else:
+                    print(f"Could not build index {collection}.{name}: {e}")
+
+
+def _has_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(v) for v in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(v) for v in plan)
+    return False
+
+
+async def find_collscans(db: AsyncIOMotorDatabase) -> List[str]:
+    """Run explain() on each route query and return the routes whose winning plan scans a collection."""
+    offenders = []
+    for query in ROUTE_QUERIES:
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        if query.get("collation"):
+            cursor = cursor.collation(query["collation"])
+        explain = await cursor.explain()
+        if _has_collscan(explain.get("queryPlanner", {}).get("winningPlan")):
+            offenders.append(f'{query["route"]} ({query["collection"]} {query["filter"]})')
+    return offenders
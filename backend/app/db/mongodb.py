@@ -1,17 +1,60 @@
+import asyncio
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReadPreference
+from pymongo.write_concern import WriteConcern
+
 from app.core.config import settings
+from app.core.metrics import command_metrics
+from app.db.monitoring import pool_stats
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
 
 class MongoDB:
     def __init__(self):
         self.client: AsyncIOMotorClient | None = None
         self.db: AsyncIOMotorDatabase | None = None
+        # Same database, tuned per route class (see Settings)
+        self.catalog_db: AsyncIOMotorDatabase | None = None
+        self.sessions_db: AsyncIOMotorDatabase | None = None
 
 db = MongoDB()
 
+def _database(read_preference: Optional[str] = None, write_concern: Optional[str] = None) -> AsyncIOMotorDatabase:
+    options = {}
+    if read_preference:
+        options["read_preference"] = READ_PREFERENCES[read_preference]
+    if write_concern:
+        options["write_concern"] = WriteConcern(w=int(write_concern) if write_concern.isdigit() else write_concern)
+    return db.client.get_database(settings.DATABASE_NAME, **options)
+
 async def connect_to_mongo():
     """Create database connection."""
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_stats, command_metrics],
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    db.client = AsyncIOMotorClient(settings.MONGODB_URL, **options)
     db.db = db.client[settings.DATABASE_NAME]
+    db.catalog_db = _database(settings.MONGO_CATALOG_READ_PREFERENCE)
+    db.sessions_db = _database(settings.MONGO_SESSIONS_READ_PREFERENCE, settings.MONGO_SESSIONS_WRITE_CONCERN)
+
+    if settings.MONGO_MIN_POOL_SIZE:
+        # Open the minimum pool now rather than on the first requests of service
+        await asyncio.gather(*(db.client.admin.command("ping") for _ in range(settings.MONGO_MIN_POOL_SIZE)))
     print("Connected to MongoDB")
 
 async def close_mongo_connection():
@@ -23,3 +66,11 @@ async def close_mongo_connection():
 def get_database() -> AsyncIOMotorDatabase:
     """Dependency to provide the database instance."""
     return db.db
+
+def get_catalog_database() -> AsyncIOMotorDatabase:
+    """Dependency for menu / restaurant config reads."""
+    return db.catalog_db
+
+def get_sessions_database() -> AsyncIOMotorDatabase:
+    """Dependency for dining session routes."""
+    return db.sessions_db
@@ -0,0 +1,75 @@
+import threading
+
+from pymongo import monitoring
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Running totals for the Motor connection pool.
+    Pool events fire on driver threads, so counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkout_failed = 0
+        self.checkout_waiting = 0
+        self.pools_cleared = 0  # not pool_cleared: that is the listener callback
+
+    def _add(self, field: str, delta: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "in_use": self.checked_out,
+                "waiting": self.checkout_waiting,
+                "created_total": self.created,
+                "closed_total": self.closed,
+                "checkout_failed_total": self.checkout_failed,
+                "pools_cleared_total": self.pools_cleared,
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("closed")
+
+    def connection_check_out_started(self, event):
+        self._add("checkout_waiting")
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_waiting -= 1
+            self.checkout_failed += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkout_waiting -= 1
+            self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+
+pool_stats = PoolStatsListener()
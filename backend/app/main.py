@@ -1,23 +1,51 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
+from app.api.idempotency import REPLAYED_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.metrics import MetricsMiddleware, metrics
+from app.db.indexes import ensure_indexes, find_collscans
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database, get_sessions_database
+from app.db.monitoring import pool_stats
+from app.services.event_relay import event_relay
+from app.services.menu_compaction import group_tombstones
+from app.services.session_archive import session_archiver
 from app.api.routes import api_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup event
     await connect_to_mongo()
+    await ensure_indexes(get_database())
+    if settings.CHECK_QUERY_PLANS:
+        offenders = await find_collscans(get_database())
+        if offenders:
+            raise RuntimeError("Collection scans in route queries: " + "; ".join(offenders))
+    if settings.EVENT_RELAY_ENABLED:
+        await event_relay.start(get_database())
+    group_tombstones.start(get_database())
+    session_archiver.start(get_sessions_database())
     yield
     # Shutdown event
+    await session_archiver.stop()
+    await group_tombstones.stop()
+    await event_relay.stop()
     await close_mongo_connection()
 
+if settings.FAST_JSON_RESPONSES:
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        raise RuntimeError("FAST_JSON_RESPONSES needs orjson: pip install orjson")
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
 )
 
 # Set up CORS for frontend connectivity
@@ -28,8 +56,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER],
 )
 
+# Outermost, so latency covers CORS and error handling too
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -37,3 +69,21 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 def root():
     """Health check endpoint."""
     return {"message": f"Welcome to {settings.PROJECT_NAME}"}
+
+@app.get("/health/db")
+def db_health():
+    """Connection pool statistics for this worker."""
+    return {"pool": pool_stats.snapshot()}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Route latency, DB round trips and pool gauges in Prometheus text format."""
+    pool = pool_stats.snapshot()
+    gauges = {
+        "spinserve_mongo_pool_open_connections": pool["open"],
+        "spinserve_mongo_pool_in_use_connections": pool["in_use"],
+        "spinserve_mongo_pool_waiting_checkouts": pool["waiting"],
+        "spinserve_mongo_pool_checkout_failed_total": pool["checkout_failed_total"],
+        "spinserve_mongo_pools_cleared_total": pool["pools_cleared_total"],
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -17,6 +17,7 @@ class GameStatus(str, Enum):
     UNLOCKED = "UNLOCKED"       # Server unlocked it (bought enough items)
     PLAYING = "PLAYING"         # Customer is currently playing
     WON = "WON"                 # Customer won the puzzle
+    SPUN = "SPUN"               # Spin used; reward_won holds the result (None = no prize)
     LOST = "LOST"               # Customer lost or time ran out
 
 class OfferType(str, Enum):
@@ -30,6 +31,10 @@ class SessionStatus(str, Enum):
     BILLED = "BILLED"           # Bill generated, waiting for payment
     CLOSED = "CLOSED"           # Paid
 
+class TicketStatus(str, Enum):
+    PENDING = "PENDING"         # On the kitchen queue
+    READY = "READY"             # Kitchen marked it ready
+
 # --- Core Entities ---
 
 class Restaurant(BaseModel):
@@ -98,13 +103,27 @@ class OrderLine(BaseModel):
     price_per_item: float
     notes: Optional[str] = None
 
+class SessionLine(OrderLine):
+    """One add-items line in `session_lines`; also the kitchen ticket for it."""
+    id: Optional[str] = Field(None, alias="_id")
+    session_id: str
+    restaurant_id: str
+    table_id: str
+    server_id: str              # the session's server, who the revenue is attributed to
+    added_by: Optional[str] = None  # staff user who entered the line
+    batch: Optional[str] = None  # add-items request it came from
+    kitchen_status: TicketStatus = TicketStatus.PENDING
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
 class DiningSession(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     restaurant_id: str
     table_id: str
     server_id: str
     
-    items: List[OrderLine] = []
+    # Running aggregates; the lines themselves live in session_lines
+    item_counts: Dict[str, int] = {}   # menu_item_id -> quantity ordered
+    line_count: int = 0
     total_amount: float = 0.0
     
     # Gamification State
@@ -113,4 +132,9 @@ class DiningSession(BaseModel):
     
     status: SessionStatus = SessionStatus.OPEN
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Set when billed: reward_won applied to total_amount
+    discount_amount: float = 0.0
+    payable_amount: Optional[float] = None
+    billed_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from app.core.config import settings
+
+RELAY_COLLECTION = "event_relay"
+
+
+class EventRelay:
+    """
+    Cross-worker fan-out for in-process hubs.
+    Each worker appends its events to a capped collection and tails it with a
+    tailable cursor, handing events from other workers to the handler
+    registered for their topic. Capped collections and tailable cursors work
+    on a standalone mongod, so no replica set / change stream is needed.
+    The cursor reads in natural (insertion) order; a re-opened one skips
+    what was already handled by $recordId. Disabled (a no-op) unless EVENT_RELAY_ENABLED is set.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[str, dict], None]] = {}
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, topic: str, handler: Callable[[str, dict], None]):
+        self._handlers[topic] = handler
+
+    @property
+    def running(self) -> bool:
+        return self._outbox is not None
+
+    def send(self, topic: str, key: str, data: dict):
+        if self._outbox is not None:
+            self._outbox.put_nowait({"origin": self.origin, "topic": topic, "key": key, "data": data})
+
+    async def start(self, db: AsyncIOMotorDatabase):
+        try:
+            await db.create_collection(RELAY_COLLECTION, capped=True, size=settings.EVENT_RELAY_SIZE_BYTES)
+        except CollectionInvalid:
+            pass  # already exists
+        collection = db[RELAY_COLLECTION]
+        # A tailable cursor on an empty capped collection dies immediately
+        await collection.insert_one({"origin": self.origin, "topic": "_start"})
+        self._outbox = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._write(collection)), asyncio.create_task(self._tail(collection))]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._outbox = None
+
+    async def _write(self, collection: AsyncIOMotorCollection):
+        # Single writer keeps each worker's events in publish order
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            try:
+                await collection.insert_many(batch, ordered=True)
+            except Exception as e:
+                print(f"Event relay write failed, dropped {len(batch)} events: {e}")
+
+    async def _tail(self, collection: AsyncIOMotorCollection):
+        # Resume by the server-assigned $recordId, which grows in insertion
+        # (natural) order. _id is made by each writer, so an event from another
+        # host, or from the same second, can sort below the last one seen.
+        newest = await collection.find_one({}, sort=[("$natural", -1)], show_record_id=True)
+        last_record = newest["$recordId"] if newest else None
+        while True:
+            cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT, show_record_id=True)
+            try:
+                while cursor.alive:
+                    async for event in cursor:
+                        if last_record is not None and event["$recordId"] <= last_record:
+                            continue  # handled before the cursor was re-opened
+                        last_record = event["$recordId"]
+                        if event["origin"] == self.origin:
+                            continue
+                        handler = self._handlers.get(event["topic"])
+                        if handler:
+                            handler(event["key"], event["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event relay tail interrupted: {e}")
+            await asyncio.sleep(1)
+
+
+event_relay = EventRelay()
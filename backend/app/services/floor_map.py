@@ -0,0 +1,147 @@
+import datetime
+import time
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.live_view import LiveView
+from app.services.session_events import session_hub
+from app.services.tenant_lru import TenantLRU
+
+# Session fields carried on a floor row and patched from session events
+PATCHED_FIELDS = ("total_amount", "game_status", "status", "item_count")
+EMPTY_SESSION = {"session_id": None, "total_amount": None, "game_status": None, "status": None,
+                 "item_count": None, "opened_at": None}
+
+
+def floor_pipeline(restaurant_id: str) -> list:
+    """Every table of a restaurant joined with its current session, in one query."""
+    return [
+        {"$match": {"restaurant_id": restaurant_id}},
+        {"$lookup": {"from": "dining_sessions", "localField": "current_session_id",
+                     "foreignField": "_id", "as": "session"}},
+        {"$project": {"table_number": 1, "session._id": 1, "session.total_amount": 1, "session.game_status": 1,
+                      "session.status": 1, "session.item_counts": 1, "session.created_at": 1}},
+    ]
+
+
+class FloorMap(LiveView):
+    """One restaurant's tables with live session state, keyed by table id."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: Dict[str, dict] = {}
+        self.by_session: Dict[str, str] = {}  # session_id -> table_id
+        self.built_at = time.monotonic()
+
+    def apply(self, session_id: str, changes: dict):
+        if self._deferred(self.apply, session_id, changes):
+            return
+        table_id = self.by_session.get(session_id)
+        if table_id is None:
+            return
+        row = self.rows[table_id]
+        if changes.get("status") == "CLOSED":
+            # Paid: the table is free again
+            row.update(EMPTY_SESSION)
+            del self.by_session[session_id]
+            return
+        for field in PATCHED_FIELDS:
+            if field in changes:
+                row[field] = changes[field]
+
+    def loaded(self, tables: List[dict]):
+        for table in tables:
+            row = {"table_id": table["_id"], "table_number": table.get("table_number"), **EMPTY_SESSION}
+            session = table["session"][0] if table.get("session") else None
+            if session and session.get("status") != "CLOSED":
+                row.update({
+                    "session_id": session["_id"],
+                    "total_amount": session.get("total_amount", 0.0),
+                    "game_status": session.get("game_status"),
+                    "status": session.get("status"),
+                    "item_count": sum(session.get("item_counts", {}).values()),
+                    "opened_at": session.get("created_at"),
+                })
+                self.by_session[session["_id"]] = table["_id"]
+            self.rows[table["_id"]] = row
+        self._finish_load()
+
+    def render(self) -> List[dict]:
+        """Rows by table number, with the session's age as of now."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows = []
+        for row in sorted(self.rows.values(), key=lambda row: (row["table_number"] is None, row["table_number"])):
+            opened_at = row["opened_at"]
+            if opened_at is not None and opened_at.tzinfo is None:
+                opened_at = opened_at.replace(tzinfo=datetime.timezone.utc)
+            age = round((now - opened_at).total_seconds()) if opened_at else None
+            rows.append({**row, "age_seconds": age})
+        return rows
+
+
+class FloorMaps:
+    """
+    Floor map per restaurant, held in each worker.
+    Built with one $lookup aggregation, then patched in place from session
+    events (this worker's and, through the event relay, other workers'), so
+    a floor refresh is a dict walk however many tables there are. Rebuilt
+    after FLOOR_MAP_TTL_SECONDS to pick up table / session changes that do
+    not go through the session hub; the old map is served meanwhile.
+    """
+
+    def __init__(self, ttl_seconds: float, max_tenants: int):
+        self._ttl = ttl_seconds
+        self._maps: TenantLRU[FloorMap] = TenantLRU(max_tenants)
+        self._building: Dict[str, FloorMap] = {}
+        self._session_tenant: Dict[str, str] = {}  # session_id -> restaurant_id, for routing events
+
+    async def get(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> FloorMap:
+        current = self._maps.get(restaurant_id)
+        if current is not None and time.monotonic() - current.built_at < self._ttl:
+            return current
+        building = self._building.get(restaurant_id)
+        if building is not None:
+            if current is not None:
+                return current
+            await building.wait()
+            return await self.get(db, restaurant_id)
+
+        floor = FloorMap()
+        self._building[restaurant_id] = floor
+        try:
+            floor.loaded(await db.tables.aggregate(floor_pipeline(restaurant_id)).to_list(None))
+        except Exception:
+            floor.failed()
+            raise
+        finally:
+            self._building.pop(restaurant_id, None)
+        if current is not None:
+            for session_id in current.by_session:
+                self._session_tenant.pop(session_id, None)
+        for session_id in floor.by_session:
+            self._session_tenant[session_id] = restaurant_id
+        self._maps[restaurant_id] = floor
+        return floor
+
+    def apply(self, session_id: str, changes: dict):
+        """Session hub listener."""
+        restaurant_id = self._session_tenant.get(session_id)
+        if restaurant_id is None:
+            # Possibly a session a loading map is about to read
+            for floor in self._building.values():
+                floor.apply(session_id, changes)
+            return
+        floors = [floor for floor in (self._maps.get(restaurant_id), self._building.get(restaurant_id)) if floor]
+        if not floors:
+            self._session_tenant.pop(session_id, None)  # map evicted
+            return
+        for floor in floors:
+            floor.apply(session_id, changes)
+        if changes.get("status") == "CLOSED":
+            self._session_tenant.pop(session_id, None)
+
+
+floor_maps = FloorMaps(settings.FLOOR_MAP_TTL_SECONDS, settings.TENANT_CACHE_MAX_TENANTS)
+session_hub.listen(floor_maps.apply)
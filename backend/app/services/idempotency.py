@@ -0,0 +1,74 @@
+import datetime
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+
+
+class IdempotencyStore:
+    """
+    Results of requests sent with an Idempotency-Key.
+    A key is reserved with an insert before the handler runs, so of two
+    concurrent requests with the same key only one executes; the result is
+    then written to the reservation (expired by a TTL index) and kept in a
+    small per-worker LRU, so most retries replay without a database read.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def _cached(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _remember(self, key: str, record: dict):
+        self._entries[key] = (time.monotonic() + self._ttl, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def reserve(self, db: AsyncIOMotorDatabase, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Claim a key for this request. Returns None when claimed, otherwise the
+        existing record: {"fingerprint", "response"} or, while the first
+        request is still running, one without "response".
+        """
+        record = self._cached(key)
+        if record is not None:
+            return record
+        try:
+            await db[IDEMPOTENCY_COLLECTION].insert_one(
+                {"_id": key, "fingerprint": fingerprint, "created_at": datetime.datetime.utcnow()})
+            return None
+        except DuplicateKeyError:
+            record = await db[IDEMPOTENCY_COLLECTION].find_one({"_id": key})
+            if record is None:  # released or expired in between
+                return await self.reserve(db, key, fingerprint)
+            if "response" in record:
+                self._remember(key, record)
+            return record
+
+    async def complete(self, db: AsyncIOMotorDatabase, key: str, fingerprint: str, response: dict):
+        await db[IDEMPOTENCY_COLLECTION].update_one({"_id": key}, {"$set": {"response": response}})
+        self._remember(key, {"fingerprint": fingerprint, "response": response})
+
+    async def release(self, db: AsyncIOMotorDatabase, key: str):
+        """Drop a reservation whose request failed, so a retry runs it again."""
+        await db[IDEMPOTENCY_COLLECTION].delete_one({"_id": key, "response": {"$exists": False}})
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCAL_CACHE_SIZE)
@@ -0,0 +1,161 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.event_relay import event_relay
+from app.services.live_view import LiveView
+from app.services.tenant_lru import TenantLRU
+
+# Ticket fields kept in memory and sent to kitchen screens
+TICKET_FIELDS = {"session_id": 1, "table_id": 1, "menu_item_id": 1, "name": 1, "quantity": 1,
+                 "notes": 1, "created_at": 1}
+
+
+def ticket_from_line(line: dict) -> dict:
+    return {"_id": line["_id"], **{field: line.get(field) for field in TICKET_FIELDS}}
+
+
+class TicketQueue(LiveView):
+    """
+    Pending tickets of one restaurant, oldest first, with consolidated
+    per-item counts. Adding or clearing a ticket is O(1).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tickets: Dict[str, dict] = {}  # insertion ordered: oldest first
+        self.pending: Dict[str, int] = defaultdict(int)  # menu_item_id -> quantity
+        self.names: Dict[str, str] = {}
+
+    def add(self, ticket: dict):
+        if not self._deferred(self.add, ticket):
+            self._insert(ticket)
+
+    def _insert(self, ticket: dict):
+        if ticket["_id"] not in self.tickets:
+            self.tickets[ticket["_id"]] = ticket
+            self.pending[ticket["menu_item_id"]] += ticket["quantity"]
+            self.names[ticket["menu_item_id"]] = ticket["name"]
+
+    def ready(self, ticket_id: str):
+        if self._deferred(self.ready, ticket_id):
+            return
+        ticket = self.tickets.pop(ticket_id, None)
+        if ticket is None:
+            return
+        item_id = ticket["menu_item_id"]
+        self.pending[item_id] -= ticket["quantity"]
+        if self.pending[item_id] <= 0:
+            del self.pending[item_id]
+            del self.names[item_id]
+
+    def loaded(self, tickets: List[dict]):
+        for ticket in tickets:
+            self._insert(ticket)
+        self._finish_load()
+
+    def counts(self) -> List[dict]:
+        return [{"menu_item_id": item_id, "name": self.names[item_id], "quantity": quantity}
+                for item_id, quantity in self.pending.items()]
+
+    def snapshot(self) -> dict:
+        return {"counts": self.counts(), "tickets": list(self.tickets.values())}
+
+
+class KitchenSubscription:
+    """Ticket changes for one kitchen screen, coalesced between sends."""
+
+    def __init__(self):
+        self._added: Dict[str, dict] = {}
+        self._ready: Set[str] = set()
+        self._event = asyncio.Event()
+
+    def push(self, added: List[dict], ready: List[str]):
+        for ticket in added:
+            self._added[ticket["_id"]] = ticket
+        for ticket_id in ready:
+            # Cleared before the screen ever saw it: send neither
+            if self._added.pop(ticket_id, None) is None:
+                self._ready.add(ticket_id)
+        self._event.set()
+
+    async def next(self) -> dict:
+        await self._event.wait()
+        self._event.clear()
+        changes = {"added": list(self._added.values()), "ready": list(self._ready)}
+        self._added, self._ready = {}, set()
+        return changes
+
+
+class KitchenQueue:
+    """
+    Kitchen ticket queue per restaurant, held in memory.
+    Every add-items line is a ticket; session_lines is the durable record
+    (kitchen_status PENDING / READY), so a restarted or newly started worker
+    rebuilds a restaurant's queue from its pending lines on first use.
+    Changes reach other workers through the event relay.
+    """
+
+    def __init__(self, max_tenants: int):
+        self._queues: TenantLRU[TicketQueue] = TenantLRU(max_tenants)
+        self._subscribers: Dict[str, Set[KitchenSubscription]] = defaultdict(set)
+
+    async def get(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> TicketQueue:
+        queue = self._queues.get(restaurant_id)
+        if queue is None:
+            queue = TicketQueue()
+            self._queues[restaurant_id] = queue
+            try:
+                cursor = db.session_lines.find({"restaurant_id": restaurant_id, "kitchen_status": "PENDING"},
+                                               TICKET_FIELDS).sort("_id", 1)
+                queue.loaded([ticket_from_line(line) async for line in cursor])
+            except Exception:
+                self._queues.pop(restaurant_id)
+                queue.failed()
+                raise
+        elif queue.loading:
+            # Another request is loading it; wait rather than serve a partial queue
+            await queue.wait()
+            if queue.loading:
+                return await self.get(db, restaurant_id)
+        return queue
+
+    def subscribe(self, restaurant_id: str) -> KitchenSubscription:
+        subscription = KitchenSubscription()
+        self._subscribers[restaurant_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, restaurant_id: str, subscription: KitchenSubscription):
+        subscriptions = self._subscribers.get(restaurant_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[restaurant_id]
+
+    def publish(self, restaurant_id: str, added: List[dict] = (), ready: List[str] = ()):
+        changes = {"added": list(added), "ready": list(ready)}
+        self.deliver(restaurant_id, changes)
+        event_relay.send("kitchen", restaurant_id, changes)
+
+    def deliver(self, restaurant_id: str, changes: dict):
+        """Apply to this worker's queue (if loaded) and screens only."""
+        queue = self._queues.get(restaurant_id)
+        if queue is not None:
+            for ticket in changes["added"]:
+                queue.add(ticket)
+            for ticket_id in changes["ready"]:
+                queue.ready(ticket_id)
+        for subscription in self._subscribers.get(restaurant_id, ()):
+            subscription.push(changes["added"], changes["ready"])
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+
+kitchen_queue = KitchenQueue(settings.TENANT_CACHE_MAX_TENANTS)
+event_relay.register("kitchen", kitchen_queue.deliver)
@@ -0,0 +1,42 @@
+import datetime
+import os
+import socket
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+LEASE_COLLECTION = "leases"
+
+
+class Lease:
+    """
+    Time-limited claim on a background job, held in one `leases` document, so
+    that of every worker (and host) running the app only one does the job.
+    The holder renews it on each pass; if it stops renewing, another worker
+    takes over once the lease expires. A pass running past the lease can
+    overlap with the next holder's, so jobs guarded by it stay idempotent.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self._ttl = datetime.timedelta(seconds=ttl_seconds)
+        self._holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def acquire(self, db: AsyncIOMotorDatabase) -> bool:
+        """Take or renew the lease. False while another worker holds it."""
+        now = datetime.datetime.utcnow()
+        try:
+            # Upserting a lease someone else holds collides on _id
+            await db[LEASE_COLLECTION].update_one(
+                {"_id": self.name, "$or": [{"holder": self._holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": self._holder, "expires_at": now + self._ttl}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def release(self, db: AsyncIOMotorDatabase):
+        """Let another worker take over without waiting for expiry."""
+        await db[LEASE_COLLECTION].delete_one({"_id": self.name, "holder": self._holder})
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Callable, Optional
+
+
+class LiveView:
+    """
+    In-memory state read once from the database and then kept current by
+    events (kitchen queue, floor map). Events that arrive while the read is
+    in flight are queued and replayed on top of what was read, so none are
+    lost or applied twice. Subclasses route each event method through
+    `_deferred` and finish their load with `_finish_load`.
+    """
+
+    def __init__(self):
+        self._backlog: Optional[list] = []  # None once loaded
+        self._settled = asyncio.Event()  # loaded, or the load failed
+
+    @property
+    def loading(self) -> bool:
+        return self._backlog is not None
+
+    def _deferred(self, apply: Callable, *args) -> bool:
+        """Queue apply(*args) for after the load. False once loaded: apply it now."""
+        if self._backlog is None:
+            return False
+        self._backlog.append((apply, args))
+        return True
+
+    def _finish_load(self):
+        backlog, self._backlog = self._backlog, None
+        for apply, args in backlog:
+            apply(*args)
+        self._settled.set()
+
+    def failed(self):
+        self._settled.set()
+
+    async def wait(self):
+        await self._settled.wait()
@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+from typing import List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.leases import Lease
+from app.services.restaurant_cache import restaurant_cache
+from app.services.tenant_lru import TenantLRU
+
+TOMBSTONE_COLLECTION = "menu_group_tombstones"
+
+
+class GroupTombstones:
+    """
+    Soft-delete for menu groups.
+    Deleting a group writes a tombstone before removing the group document, so
+    a crash at any point leaves the group either intact or tombstoned, never
+    with untracked orphan items. Menu reads skip items of tombstoned groups;
+    a background task deletes those items in MENU_COMPACTION_BATCH_SIZE
+    batches and then drops the tombstone. One worker at a time runs it,
+    under a lease.
+    """
+
+    def __init__(self):
+        # restaurant_id -> (menu_revision, tombstoned group ids)
+        self._cached: TenantLRU[Tuple[int, List[str]]] = TenantLRU(settings.TENANT_CACHE_MAX_TENANTS)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._lease = Lease("menu_compaction", 2 * settings.MENU_COMPACTION_INTERVAL_SECONDS)
+
+    async def group_ids(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> List[str]:
+        """Tombstoned groups of a restaurant; reloaded when its menu revision moves."""
+        restaurant = await restaurant_cache.get(db, restaurant_id)
+        revision = restaurant.get("menu_revision", 0) if restaurant else 0
+        cached = self._cached.get(restaurant_id)
+        if cached and cached[0] == revision:
+            return cached[1]
+        ids = [doc["_id"] async for doc in db[TOMBSTONE_COLLECTION].find({"restaurant_id": restaurant_id}, {"_id": 1})]
+        self._cached[restaurant_id] = (revision, ids)
+        return ids
+
+    async def bury(self, db: AsyncIOMotorDatabase, group: dict):
+        """Tombstone a group and delete it; its items are left for the compactor."""
+        await db[TOMBSTONE_COLLECTION].update_one(
+            {"_id": group["_id"]},
+            {"$setOnInsert": {"restaurant_id": group["restaurant_id"], "deleted_at": datetime.datetime.utcnow()}},
+            upsert=True
+        )
+        await db.menu_groups.delete_one({"_id": group["_id"]})
+        if self._wake is not None:
+            self._wake.set()
+
+    async def compact(self, db: AsyncIOMotorDatabase) -> int:
+        """Sweep items of every tombstoned group. Returns the number of items deleted."""
+        deleted = 0
+        async for tombstone in db[TOMBSTONE_COLLECTION].find({}):
+            query = {"restaurant_id": tombstone["restaurant_id"], "group_id": tombstone["_id"]}
+            while True:
+                ids = [doc["_id"] async for doc in
+                       db.menu_items.find(query, {"_id": 1}).limit(settings.MENU_COMPACTION_BATCH_SIZE)]
+                if not ids:
+                    break
+                result = await db.menu_items.delete_many({"_id": {"$in": ids}})
+                deleted += result.deleted_count
+            # A crash between tombstone and group delete leaves the group behind
+            await db.menu_groups.delete_one({"_id": tombstone["_id"]})
+            await db[TOMBSTONE_COLLECTION].delete_one({"_id": tombstone["_id"]})
+        return deleted
+
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await self._lease.release(self._db)
+        self._task = None
+        self._wake = None
+
+    async def _run(self, db: AsyncIOMotorDatabase):
+        while True:
+            try:
+                deleted = await self.compact(db) if await self._lease.acquire(db) else 0
+                if deleted:
+                    print(f"Menu compaction removed {deleted} items of deleted groups")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Menu compaction failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.MENU_COMPACTION_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+group_tombstones = GroupTombstones()
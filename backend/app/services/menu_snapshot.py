@@ -0,0 +1,105 @@
+import json
+from typing import Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.services.tenant_lru import TenantLRU
+
+SNAPSHOT_COLLECTION = "menu_snapshots"
+
+
+def _group_entry(doc: dict) -> dict:
+    return {"title": doc["title"], "image_url": doc.get("image_url"), "items": {}}
+
+
+def _item_entry(doc: dict) -> dict:
+    return {"name": doc["name"], "description": doc.get("description"),
+            "price": doc["price"], "image_url": doc.get("image_url")}
+
+
+def _serialize(restaurant_id: str, doc: dict) -> bytes:
+    groups = []
+    for group_id, group in sorted(doc["groups"].items()):
+        items = [{"id": item_id, **item} for item_id, item in sorted(group["items"].items())]
+        groups.append({"id": group_id, "title": group["title"], "image_url": group["image_url"], "items": items})
+    return json.dumps({"restaurant_id": restaurant_id, "revision": doc["revision"], "groups": groups}).encode()
+
+
+class MenuSnapshots:
+    """
+    One denormalized document per restaurant in `menu_snapshots`: every group
+    with its available items nested, keyed by id so each menu write is a
+    single dotted `$set` / `$unset` on it.
+    Writes patch the snapshot and `$inc` its revision *before* bumping the
+    restaurant's `menu_revision`, so a snapshot whose revision has reached the
+    restaurant's already holds every write counted there. The serialized JSON
+    is kept in memory per restaurant; a snapshot that is missing or behind is
+    rebuilt from the menu collections.
+    """
+
+    def __init__(self):
+        self._serialized: TenantLRU[Tuple[int, bytes]] = TenantLRU(settings.TENANT_CACHE_MAX_TENANTS)
+
+    async def get(self, db: AsyncIOMotorDatabase, restaurant: dict) -> bytes:
+        restaurant_id = restaurant["_id"]
+        revision = restaurant.get("menu_revision", 0)
+        cached = self._serialized.get(restaurant_id)
+        if cached and cached[0] >= revision:
+            return cached[1]
+
+        doc = await db[SNAPSHOT_COLLECTION].find_one({"_id": restaurant_id})
+        if doc is None or doc["revision"] < revision:
+            doc = await self.rebuild(db, restaurant_id)
+        body = _serialize(restaurant_id, doc)
+        if cached is None or cached[0] < doc["revision"]:
+            self._serialized[restaurant_id] = (doc["revision"], body)
+        return body
+
+    async def rebuild(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> dict:
+        # Revision first: writes finishing during the scan leave the snapshot
+        # behind, so the next read rebuilds again instead of missing them
+        restaurant = await db.restaurants.find_one({"_id": restaurant_id}, {"menu_revision": 1})
+        revision = restaurant.get("menu_revision", 0) if restaurant else 0
+        groups = {}
+        async for group in db.menu_groups.find({"restaurant_id": restaurant_id}):
+            groups[group["_id"]] = _group_entry(group)
+        async for item in db.menu_items.find({"restaurant_id": restaurant_id, "is_available": True}):
+            if item["group_id"] in groups:
+                groups[item["group_id"]]["items"][item["_id"]] = _item_entry(item)
+        doc = {"_id": restaurant_id, "revision": revision, "groups": groups}
+        try:
+            await db[SNAPSHOT_COLLECTION].replace_one(
+                {"_id": restaurant_id, "revision": {"$lt": revision}}, doc, upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # stored snapshot is already as new; this one is still a consistent read
+        return doc
+
+    async def _patch(self, db: AsyncIOMotorDatabase, restaurant_id: str, update: dict, query: Optional[dict] = None):
+        await db[SNAPSHOT_COLLECTION].update_one(
+            {"_id": restaurant_id, **(query or {})}, {**update, "$inc": {"revision": 1}}
+        )
+
+    async def add_group(self, db: AsyncIOMotorDatabase, group: dict):
+        await self._patch(db, group["restaurant_id"], {"$set": {f"groups.{group['_id']}": _group_entry(group)}})
+
+    async def remove_group(self, db: AsyncIOMotorDatabase, restaurant_id: str, group_id: str):
+        await self._patch(db, restaurant_id, {"$unset": {f"groups.{group_id}": ""}})
+
+    async def put_item(self, db: AsyncIOMotorDatabase, item: dict):
+        """Insert or replace one item, or drop it once it is no longer available."""
+        path = f"groups.{item['group_id']}.items.{item['_id']}"
+        if item.get("is_available", True):
+            # Never resurrect a group deleted concurrently
+            await self._patch(db, item["restaurant_id"], {"$set": {path: _item_entry(item)}},
+                              query={f"groups.{item['group_id']}": {"$exists": True}})
+        else:
+            await self._patch(db, item["restaurant_id"], {"$unset": {path: ""}})
+
+    async def remove_item(self, db: AsyncIOMotorDatabase, item: dict):
+        await self._patch(db, item["restaurant_id"], {"$unset": {f"groups.{item['group_id']}.items.{item['_id']}": ""}})
+
+
+menu_snapshots = MenuSnapshots()
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.services.event_relay import event_relay
+from app.services.spinner import SpinnerSampler
+from app.services.tenant_lru import TenantLRU
+
+
+class CachedRestaurant:
+    __slots__ = ("doc", "version", "menu_revision", "expires_at", "sampler")
+
+    def __init__(self, doc: dict, ttl: float):
+        self.doc = doc
+        self.version = doc.get("config_version", 0)
+        self.menu_revision = doc.get("menu_revision", 0)
+        self.expires_at = time.monotonic() + ttl
+        self.sampler: Optional[SpinnerSampler] = None
+
+
+class RestaurantConfigCache:
+    """
+    Read-through cache of restaurant documents (thresholds, spinner slots,
+    menu revision). Entries live for RESTAURANT_CACHE_TTL_SECONDS. Config
+    writes bump `config_version` and menu writes bump `menu_revision`; the new
+    document is pushed in via `put`, so the writing worker is updated
+    immediately and a slower, older read can never overwrite a newer entry.
+    Other workers drop their entry when the write arrives over the event relay.
+    """
+
+    def __init__(self, ttl_seconds: float, max_tenants: int):
+        self._ttl = ttl_seconds
+        self._entries: TenantLRU[CachedRestaurant] = TenantLRU(max_tenants)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> Optional[dict]:
+        entry = self._entries.get(restaurant_id)
+        if entry and entry.expires_at > time.monotonic():
+            return entry.doc
+
+        # Collapse concurrent misses for the same restaurant into one read
+        task = self._inflight.get(restaurant_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(db, restaurant_id))
+            self._inflight[restaurant_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(restaurant_id, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, db: AsyncIOMotorDatabase, restaurant_id: str) -> Optional[dict]:
+        doc = await db.restaurants.find_one({"_id": restaurant_id})
+        if doc is None:
+            self.invalidate(restaurant_id)
+            return None
+        return self.put(doc)
+
+    def put(self, doc: dict) -> dict:
+        """Store a fresh document unless a newer config version is already cached."""
+        current = self._entries.get(doc["_id"])
+        if current and (current.version > doc.get("config_version", 0)
+                        or current.menu_revision > doc.get("menu_revision", 0)):
+            return current.doc
+        entry = CachedRestaurant(doc, self._ttl)
+        if current and current.version == entry.version:
+            # Same config version: keep the already compiled sampler
+            entry.sampler = current.sampler
+        self._entries[doc["_id"]] = entry
+        return doc
+
+    def sampler_for(self, restaurant: dict) -> SpinnerSampler:
+        """Compiled spinner for a restaurant document returned by `get`."""
+        entry = self._entries.get(restaurant["_id"])
+        if entry is None or entry.version != restaurant.get("config_version", 0):
+            return SpinnerSampler(restaurant["spinner_slots"])
+        if entry.sampler is None:
+            entry.sampler = SpinnerSampler(restaurant["spinner_slots"])
+        return entry.sampler
+
+    async def bump_menu_revision(self, db: AsyncIOMotorDatabase, restaurant_id: str):
+        """Record a menu write: new ETag for menu reads here and in other workers."""
+        doc = await db.restaurants.find_one_and_update(
+            {"_id": restaurant_id},
+            {"$inc": {"menu_revision": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            self.put(doc)
+        self.announce(restaurant_id)
+
+    def announce(self, restaurant_id: str):
+        """Tell the other workers their copy is stale."""
+        event_relay.send("restaurant", restaurant_id, {})
+
+    def invalidate(self, restaurant_id: str):
+        self._entries.pop(restaurant_id, None)
+
+
+restaurant_cache = RestaurantConfigCache(ttl_seconds=settings.RESTAURANT_CACHE_TTL_SECONDS,
+                                         max_tenants=settings.TENANT_CACHE_MAX_TENANTS)
+event_relay.register("restaurant", lambda restaurant_id, _: restaurant_cache.invalidate(restaurant_id))
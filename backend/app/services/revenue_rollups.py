@@ -0,0 +1,159 @@
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.services.session_archive import LINE_ARCHIVE_PREFIX, SESSION_ARCHIVE_PREFIX
+
+ROLLUP_COLLECTION = "revenue_rollups"
+PERIODS = ("hour", "day")
+ALL = "all"  # key of the per-restaurant total rows
+
+# Counters per dimension; a bucket row only carries the ones written to it
+ORDER_FIELDS = ("ordered_amount", "ordered_quantity")
+CLOSE_FIELDS = ("sessions_closed", "billed_amount", "discount_amount")
+
+# Group key per dimension in the backfill pipelines. Lines carry their
+# session's server_id, so orders and closes credit the same server.
+LINE_KEYS = {"total": {"$literal": ALL}, "item": "$menu_item_id", "server": "$server_id"}
+SESSION_KEYS = {"total": {"$literal": ALL}, "server": "$server_id"}
+
+
+def bucket_start(at: datetime.datetime, period: str) -> datetime.datetime:
+    at = at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0) if period == "day" else at
+
+
+def rollup_id(restaurant_id: str, period: str, bucket: datetime.datetime, dimension: str, key: str) -> str:
+    # Same shape as the backfill's $dateToString "%Y%m%d%H", so both write the same rows
+    return f"{restaurant_id}:{period}:{bucket:%Y%m%d%H}:{dimension}:{key}"
+
+
+class RevenueRollups:
+    """
+    Pre-aggregated revenue per restaurant, UTC hour and day buckets, split
+    into a restaurant total ("all"), per menu item and per server (the
+    session's server, whoever entered the line). Orders and closes $inc
+    their buckets with upserts in one bulk_write, so the dashboard reads a
+    few rows per bucket instead of every session.
+    backfill() (scripts/backfill_rollups.py) rebuilds them from history.
+    """
+
+    async def _inc(self, db: AsyncIOMotorDatabase, restaurant_id: str, at: datetime.datetime,
+                   rows: Dict[Tuple[str, str], dict], names: Dict[str, str] = None):
+        ops = []
+        for period in PERIODS:
+            bucket = bucket_start(at, period)
+            for (dimension, key), counters in rows.items():
+                fields = {"restaurant_id": restaurant_id, "period": period, "bucket": bucket,
+                          "dimension": dimension, "key": key}
+                update = {"$inc": counters, "$setOnInsert": fields}
+                if names and key in names:
+                    update["$set"] = {"name": names[key]}
+                ops.append(UpdateOne({"_id": rollup_id(restaurant_id, period, bucket, dimension, key)}, update, upsert=True))
+        try:
+            await db[ROLLUP_COLLECTION].bulk_write(ops, ordered=False)
+        except Exception as e:
+            # Sessions stay the source of truth; a backfill repairs missed increments
+            print(f"Revenue rollup update failed for {restaurant_id}: {e}")
+
+    async def record_order(self, db: AsyncIOMotorDatabase, restaurant_id: str, lines: List[dict]):
+        """Count priced add-items lines (all from one request)."""
+        rows: Dict[Tuple[str, str], dict] = {}
+        names = {}
+        for line in lines:
+            amount = line["price_per_item"] * line["quantity"]
+            for row in (("total", ALL), ("item", line["menu_item_id"]), ("server", line["server_id"])):
+                counters = rows.setdefault(row, {"ordered_amount": 0.0, "ordered_quantity": 0})
+                counters["ordered_amount"] += amount
+                counters["ordered_quantity"] += line["quantity"]
+            names[line["menu_item_id"]] = line["name"]
+        await self._inc(db, restaurant_id, lines[0]["created_at"], rows, names)
+
+    async def record_close(self, db: AsyncIOMotorDatabase, session: dict):
+        """Count a closed session's bill."""
+        counters = {"sessions_closed": 1, "billed_amount": session["payable_amount"],
+                    "discount_amount": session["discount_amount"]}
+        rows = {("total", ALL): counters, ("server", session["server_id"]): counters}
+        await self._inc(db, session["restaurant_id"], session["closed_at"], rows)
+
+    async def dashboard(self, db: AsyncIOMotorDatabase, restaurant_id: str, period: str,
+                        start: datetime.datetime, end: datetime.datetime) -> dict:
+        """Buckets in [start, end) plus item / server totals over the range."""
+        buckets, items, servers = [], {}, {}
+        query = {"restaurant_id": restaurant_id, "period": period,
+                 "bucket": {"$gte": bucket_start(start, period), "$lt": end}}
+        async for row in db[ROLLUP_COLLECTION].find(query).sort("bucket", 1):
+            if row["dimension"] == "total":
+                buckets.append({"bucket": row["bucket"],
+                                **{field: row.get(field, 0) for field in ORDER_FIELDS + CLOSE_FIELDS}})
+                continue
+            target, fields = (items, ORDER_FIELDS) if row["dimension"] == "item" else (servers, ORDER_FIELDS + CLOSE_FIELDS)
+            entry = target.setdefault(row["key"], {"key": row["key"], **{field: 0 for field in fields}})
+            if row.get("name"):
+                entry["name"] = row["name"]
+            for field in fields:
+                entry[field] += row.get(field, 0)
+        by_amount = lambda entry: entry["ordered_amount"]
+        return {
+            "period": period,
+            "buckets": buckets,
+            "items": sorted(items.values(), key=by_amount, reverse=True),
+            "servers": sorted(servers.values(), key=by_amount, reverse=True),
+        }
+
+    @staticmethod
+    def _backfill_pipeline(match: dict, date_field: str, period: str, dimension: str, key, counters: dict) -> list:
+        group = {"_id": {"r": "$restaurant_id", "b": {"$dateTrunc": {"date": date_field, "unit": period}}, "k": key},
+                 **counters}
+        if dimension == "item":
+            group["name"] = {"$last": "$name"}
+        project = {field: 1 for field in group if field != "_id"}
+        # Several source collections feed the same buckets, so matches add up
+        merged = {field: {"$add": [{"$ifNull": ["$" + field, 0]}, "$$new." + field]} for field in counters}
+        if dimension == "item":
+            merged["name"] = "$$new.name"
+        return [
+            {"$match": match},
+            {"$group": group},
+            {"$project": {
+                "_id": {"$concat": ["$_id.r", f":{period}:", {"$dateToString": {"date": "$_id.b", "format": "%Y%m%d%H"}},
+                                    f":{dimension}:", "$_id.k"]},
+                "restaurant_id": "$_id.r", "period": {"$literal": period}, "bucket": "$_id.b",
+                "dimension": {"$literal": dimension}, "key": "$_id.k", **project,
+            }},
+            {"$merge": {"into": ROLLUP_COLLECTION, "on": "_id", "whenMatched": [{"$set": merged}],
+                        "whenNotMatched": "insert"}},
+        ]
+
+    async def backfill(self, db: AsyncIOMotorDatabase, restaurant_id: Optional[str] = None):
+        """
+        Rebuild rollups (of one restaurant, or all) from session lines and
+        closed sessions, hot and archived, with $group + $merge pipelines run
+        in the database. Needs MongoDB 5.0+ ($dateTrunc). Increments made
+        while it runs can be counted twice, so run it in a quiet period.
+        """
+        scope = {"restaurant_id": restaurant_id} if restaurant_id else {}
+        await db[ROLLUP_COLLECTION].delete_many(scope)
+        names = await db.list_collection_names()
+        line_sources = sorted(n for n in names if n == "session_lines" or n.startswith(LINE_ARCHIVE_PREFIX))
+        session_sources = sorted(n for n in names if n == "dining_sessions" or n.startswith(SESSION_ARCHIVE_PREFIX))
+        order_counters = {"ordered_amount": {"$sum": {"$multiply": ["$price_per_item", "$quantity"]}},
+                          "ordered_quantity": {"$sum": "$quantity"}}
+        close_counters = {"sessions_closed": {"$sum": 1},
+                          "billed_amount": {"$sum": {"$ifNull": ["$payable_amount", "$total_amount"]}},
+                          "discount_amount": {"$sum": {"$ifNull": ["$discount_amount", 0]}}}
+        for period in PERIODS:
+            for source in line_sources:
+                for dimension, key in LINE_KEYS.items():
+                    pipeline = self._backfill_pipeline(scope, "$created_at", period, dimension, key, order_counters)
+                    await db[source].aggregate(pipeline).to_list(None)
+            for source in session_sources:
+                match = {**scope, "status": "CLOSED", "closed_at": {"$ne": None}}
+                for dimension, key in SESSION_KEYS.items():
+                    pipeline = self._backfill_pipeline(match, "$closed_at", period, dimension, key, close_counters)
+                    await db[source].aggregate(pipeline).to_list(None)
+
+
+revenue_rollups = RevenueRollups()
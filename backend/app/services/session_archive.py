@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+from typing import Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+
+from app.core.config import settings
+from app.services.leases import Lease
+
+SESSION_ARCHIVE_PREFIX = "dining_sessions_archive_"
+LINE_ARCHIVE_PREFIX = "session_lines_archive_"
+
+
+def archive_suffix(closed_at: datetime.datetime) -> str:
+    """Month partition of a closed session, e.g. 202610."""
+    return closed_at.strftime("%Y%m")
+
+
+class SessionArchiver:
+    """
+    Moves closed sessions out of the hot dining_sessions / session_lines
+    collections into monthly ones (dining_sessions_archive_YYYYMM,
+    session_lines_archive_YYYYMM), SESSION_ARCHIVE_BATCH_SIZE sessions at a
+    time, once they have been closed for SESSION_ARCHIVE_AFTER_SECONDS.
+    Archive writes are upserts and hot deletes come last, so a batch
+    interrupted at any point is simply redone by the next pass. One worker
+    at a time runs it, under a lease.
+    """
+
+    def __init__(self):
+        self._indexed: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._lease = Lease("session_archiver", 2 * settings.SESSION_ARCHIVE_INTERVAL_SECONDS)
+
+    async def _ensure_archive_indexes(self, db: AsyncIOMotorDatabase, suffix: str):
+        if suffix in self._indexed:
+            return
+        await db[SESSION_ARCHIVE_PREFIX + suffix].create_indexes([
+            IndexModel([("restaurant_id", ASCENDING), ("closed_at", ASCENDING)], name="restaurant_closed_at"),
+        ])
+        await db[LINE_ARCHIVE_PREFIX + suffix].create_indexes([
+            IndexModel([("session_id", ASCENDING), ("_id", ASCENDING)], name="session_id"),
+        ])
+        self._indexed.add(suffix)
+
+    async def archive(self, db: AsyncIOMotorDatabase) -> int:
+        """Archive every session closed before the grace period. Returns the number moved."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.SESSION_ARCHIVE_AFTER_SECONDS)
+        query = {"status": "CLOSED", "closed_at": {"$lt": cutoff}}
+        moved = 0
+        while True:
+            sessions = await db.dining_sessions.find(query).sort("closed_at", ASCENDING) \
+                .limit(settings.SESSION_ARCHIVE_BATCH_SIZE).to_list(None)
+            if not sessions:
+                return moved
+            by_month = {}
+            for session in sessions:
+                by_month.setdefault(archive_suffix(session["closed_at"]), []).append(session)
+            for suffix, batch in by_month.items():
+                await self._ensure_archive_indexes(db, suffix)
+                ids = [session["_id"] for session in batch]
+                lines = await db.session_lines.find({"session_id": {"$in": ids}}).to_list(None)
+                if lines:
+                    await db[LINE_ARCHIVE_PREFIX + suffix].bulk_write(
+                        [ReplaceOne({"_id": line["_id"]}, line, upsert=True) for line in lines], ordered=False)
+                await db[SESSION_ARCHIVE_PREFIX + suffix].bulk_write(
+                    [ReplaceOne({"_id": session["_id"]}, session, upsert=True) for session in batch], ordered=False)
+                await db.session_lines.delete_many({"session_id": {"$in": ids}})
+                await db.dining_sessions.delete_many({"_id": {"$in": ids}, "status": "CLOSED"})
+                moved += len(batch)
+
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await self._lease.release(self._db)
+        self._task = None
+
+    async def _run(self, db: AsyncIOMotorDatabase):
+        while True:
+            try:
+                moved = await self.archive(db) if await self._lease.acquire(db) else 0
+                if moved:
+                    print(f"Session archiver moved {moved} closed sessions")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Session archiving failed: {e}")
+            await asyncio.sleep(settings.SESSION_ARCHIVE_INTERVAL_SECONDS)
+
+
+session_archiver = SessionArchiver()
@@ -0,0 +1,73 @@
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Set
+
+from app.services.event_relay import event_relay
+
+
+class SessionSubscription:
+    """Pending changes for one stream; newer values overwrite older ones."""
+
+    def __init__(self):
+        self._pending: dict = {}
+        self._ready = asyncio.Event()
+
+    def push(self, changes: dict):
+        self._pending.update(changes)
+        self._ready.set()
+
+    async def next(self) -> dict:
+        await self._ready.wait()
+        self._ready.clear()
+        changes, self._pending = self._pending, {}
+        return changes
+
+
+class SessionEventHub:
+    """
+    In-process pub/sub for dining session changes.
+    Routes publish the fields they just wrote; every stream subscribed to that
+    session receives them. Updates are coalesced per subscriber, so an idle or
+    slow client costs one small dict no matter how many writes happen.
+    With several workers, the event relay carries changes to the others.
+    In-process views derived from sessions register a listener for the same feed.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[SessionSubscription]] = defaultdict(set)
+        self._listeners: List[Callable[[str, dict], None]] = []
+
+    def listen(self, listener: Callable[[str, dict], None]):
+        self._listeners.append(listener)
+
+    def subscribe(self, session_id: str) -> SessionSubscription:
+        subscription = SessionSubscription()
+        self._subscribers[session_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, session_id: str, subscription: SessionSubscription):
+        subscriptions = self._subscribers.get(session_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[session_id]
+
+    def publish(self, session_id: str, changes: dict):
+        self.deliver(session_id, changes)
+        event_relay.send("session", session_id, changes)
+
+    def deliver(self, session_id: str, changes: dict):
+        """Push to this worker's subscribers and listeners only."""
+        for listener in self._listeners:
+            listener(session_id, changes)
+        for subscription in self._subscribers.get(session_id, ()):
+            subscription.push(changes)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+
+session_hub = SessionEventHub()
+event_relay.register("session", session_hub.deliver)
@@ -0,0 +1,47 @@
+import random
+from typing import List, Optional
+
+from app.core.config import settings
+
+# Shared generator for live spins. Set SPINNER_SEED to make draws repeatable.
+_rng = random.Random(settings.SPINNER_SEED)
+
+
+class SpinnerSampler:
+    """
+    Vose's alias method over the spinner slot probabilities.
+    Building the tables is O(n) and done once per config version; every draw
+    is then O(1): pick a column uniformly, then keep it or take its alias.
+    """
+
+    def __init__(self, slots: List[dict], rng: Optional[random.Random] = None):
+        if not slots:
+            raise ValueError("Spinner has no slots")
+        total = sum(slot["probability"] for slot in slots)
+        if total <= 0:
+            raise ValueError("Spinner slot probabilities must add up to more than 0")
+
+        n = len(slots)
+        self.slots = slots
+        self._rng = rng or _rng
+        self._prob = [0.0] * n
+        self._alias = list(range(n))
+
+        scaled = [slot["probability"] * n / total for slot in slots]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to float rounding
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def draw(self) -> dict:
+        column = int(self._rng.random() * len(self._prob))
+        if self._rng.random() < self._prob[column]:
+            return self.slots[column]
+        return self.slots[self._alias[column]]
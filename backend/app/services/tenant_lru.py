@@ -0,0 +1,35 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TenantLRU(Generic[V]):
+    """
+    One cache slot per restaurant, least recently used restaurant evicted
+    first (TENANT_CACHE_MAX_TENANTS). A busy outlet only ever refreshes its
+    own slot, so it cannot push another outlet's entries out; only outlets
+    idle long enough to fall off the end are evicted.
+    """
+
+    def __init__(self, max_tenants: int):
+        self._max = max_tenants
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+
+    def get(self, tenant: Hashable) -> Optional[V]:
+        value = self._entries.get(tenant)
+        if value is not None:
+            self._entries.move_to_end(tenant)
+        return value
+
+    def __setitem__(self, tenant: Hashable, value: V):
+        self._entries[tenant] = value
+        self._entries.move_to_end(tenant)
+        while len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+
+    def pop(self, tenant: Hashable, default: Optional[V] = None) -> Optional[V]:
+        return self._entries.pop(tenant, default)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,23 +1,96 @@
+import hashlib
+import hmac
+import os
+import time
+from typing import Dict, Optional, Tuple
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import create_access_token, hash_password_async, verify_password_async
 from app.models.schemas import User
 
+
+class VerifiedLoginCache:
+    """
+    Logins verified in the last LOGIN_CACHE_TTL_SECONDS, so a repeat login
+    (app reloads, shift-start storms) skips the user lookup and the password
+    hash. Keyed by an HMAC of mobile + password under a per-process secret;
+    no plaintext is kept.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000):
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._secret = os.urandom(32)
+        self._entries: Dict[bytes, Tuple[float, dict]] = {}
+
+    def _key(self, mobile: str, password: str) -> bytes:
+        return hmac.new(self._secret, f"{mobile}\0{password}".encode(), hashlib.sha256).digest()
+
+    def get(self, mobile: str, password: str) -> Optional[dict]:
+        key = self._key(mobile, password)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def put(self, mobile: str, password: str, user: dict):
+        if self._ttl <= 0:
+            return
+        if len(self._entries) >= self._max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[self._key(mobile, password)] = (time.monotonic() + self._ttl, user)
+
+    def invalidate_user(self, user_id: str):
+        """Forget a user's verified logins (credentials or role changed, user removed)."""
+        for key in [k for k, (_, user) in self._entries.items() if user["id"] == user_id]:
+            self._entries.pop(key, None)
+
+
+login_cache = VerifiedLoginCache(ttl_seconds=settings.LOGIN_CACHE_TTL_SECONDS)
+
+
 class UserService:
     @staticmethod
     async def authenticate_user(db: AsyncIOMotorDatabase, mobile: str, password: str):
+        cached = login_cache.get(mobile, password)
+        if cached:
+            return UserService._with_token(cached)
+
         user_data = await db.users.find_one({"mobile": mobile})
         
         if not user_data:
             raise HTTPException(status_code=401, detail="Invalid mobile number or security key")
             
-        # Standard safety check: In production use hashed password comparison
-        # For this standard architecture demo, we match seeded password
-        if user_data["hashed_password"] != password:
+        # Hashing runs on the password pool, not the event loop
+        matches, needs_rehash = await verify_password_async(password, user_data["hashed_password"])
+        if not matches:
             raise HTTPException(status_code=401, detail="Invalid mobile number or security key")
+
+        if needs_rehash:
+            # Legacy plaintext or outdated cost parameters; skipped if the password changed meanwhile
+            await db.users.update_one(
+                {"_id": user_data["_id"], "hashed_password": user_data["hashed_password"]},
+                {"$set": {"hashed_password": await hash_password_async(password)}}
+            )
             
-        return {
+        user = {
             "id": str(user_data["_id"]),
             "name": user_data["name"],
             "role": user_data["role"],
             "restaurant_id": user_data.get("restaurant_id")
         }
+        login_cache.put(mobile, password, user)
+        return UserService._with_token(user)
+
+    @staticmethod
+    def _with_token(user: dict) -> dict:
+        token, expires_at = create_access_token({
+            "sub": user["id"], "name": user["name"], "role": user["role"], "rid": user["restaurant_id"]
+        })
+        return {**user, "access_token": token, "token_type": "bearer", "expires_at": expires_at}
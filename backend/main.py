@@ -1,10 +1,44 @@
 import uvicorn
 
 if __name__ == "__main__":
+    import argparse
     import os
     import sys
-    
+
     # Ensure the app module can be found
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+
+    parser = argparse.ArgumentParser(description="Run the SpinServe API")
+    parser.add_argument("--prod", action="store_true",
+                        help="multi-worker production mode without the auto-reloader")
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+        sys.exit(0)
+
+    from app.core.config import settings
+
+    workers = settings.SERVER_WORKERS or os.cpu_count() or 1
+    if workers > 1 and not settings.AUTH_SECRET_KEYS:
+        sys.exit("Set AUTH_SECRET_KEYS: each worker would otherwise sign tokens with its own random key")
+    if workers > 1:
+        # Workers inherit the environment; session streams need cross-worker events
+        os.environ.setdefault("EVENT_RELAY_ENABLED", "true")
+
+    # loop/http "auto" pick uvloop and httptools when they are installed.
+    # SIGTERM stops accepting connections and drains in-flight requests for up
+    # to SERVER_GRACEFUL_SHUTDOWN_SECONDS before closing long-lived streams.
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+    )
@@ -0,0 +1,48 @@
+"""
+Rebuild the revenue rollups behind GET /restaurant/revenue from history.
+
+    cd backend && python scripts/backfill_rollups.py                   # every restaurant
+    cd backend && python scripts/backfill_rollups.py --restaurant rest_001
+
+Deletes the rollup rows in scope, then re-aggregates session_lines and closed
+dining_sessions (including the monthly archive collections) with $group +
+$merge pipelines inside MongoDB (5.0+). Orders taken while it runs can be
+counted twice, so run it in a quiet period.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.db.indexes import ensure_indexes
+from app.services.revenue_rollups import ROLLUP_COLLECTION, revenue_rollups
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--restaurant", help="only rebuild this restaurant's rollups")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+    try:
+        await ensure_indexes(db)
+        start = time.perf_counter()
+        await revenue_rollups.backfill(db, args.restaurant)
+        scope = {"restaurant_id": args.restaurant} if args.restaurant else {}
+        rows = await db[ROLLUP_COLLECTION].count_documents(scope)
+    finally:
+        client.close()
+
+    print(f"Rebuilt {rows} rollup rows in {time.perf_counter() - start:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
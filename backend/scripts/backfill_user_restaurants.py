@@ -0,0 +1,74 @@
+"""
+Give every user without a restaurant_id the restaurant they belong to.
+
+    cd backend && python scripts/backfill_user_restaurants.py            # apply
+    cd backend && python scripts/backfill_user_restaurants.py --dry-run
+
+Access tokens carry the user's restaurant and tokens without one are refused,
+so accounts created before users were scoped to a restaurant cannot use the
+API until this has run. Owners get the restaurant whose owner_id they are.
+Staff get the restaurant of the sessions they have served, or the only
+restaurant when there is just one. Users it cannot place are listed so they
+can be fixed by hand. Safe to re-run: only users still missing a restaurant
+are touched. Users have to log in again to get a token with it.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.core.config import settings
+
+MISSING = {"$in": [None, ""]}  # also matches documents without the field
+
+
+async def resolve(db: AsyncIOMotorDatabase, user: dict, owned: Dict[str, str], only: Optional[str]) -> Optional[str]:
+    if user["_id"] in owned:
+        return owned[user["_id"]]
+    if user.get("role") == "OWNER":
+        return None
+    served = await db.dining_sessions.distinct("restaurant_id", {"server_id": user["_id"]})
+    if len(served) == 1:
+        return served[0]
+    return only if not served else None
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+    try:
+        restaurants = await db.restaurants.find({}, {"owner_id": 1}).to_list(None)
+        owned = {r["owner_id"]: r["_id"] for r in restaurants if r.get("owner_id")}
+        only = restaurants[0]["_id"] if len(restaurants) == 1 else None
+        ops, unresolved = [], []
+        async for user in db.users.find({"restaurant_id": MISSING}, {"role": 1, "name": 1}):
+            restaurant_id = await resolve(db, user, owned, only)
+            if restaurant_id is None:
+                unresolved.append(user)
+                continue
+            print(f"{user['_id']} ({user.get('role')}) -> {restaurant_id}")
+            ops.append(UpdateOne({"_id": user["_id"], "restaurant_id": MISSING},
+                                 {"$set": {"restaurant_id": restaurant_id}}))
+        if ops and not args.dry_run:
+            await db.users.bulk_write(ops, ordered=False)
+    finally:
+        client.close()
+
+    for user in unresolved:
+        print(f"Could not place {user['_id']} ({user.get('role')}, {user.get('name')}): set restaurant_id by hand")
+    print(f"{'Would update' if args.dry_run else 'Updated'} {len(ops)} users, {len(unresolved)} left without a restaurant.")
+    return 1 if unresolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
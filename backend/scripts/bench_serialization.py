@@ -0,0 +1,77 @@
+"""
+List-response serialization micro-benchmark.
+
+    cd backend && python scripts/bench_serialization.py
+
+Serializes a 5k-item menu page (raw Mongo documents, as fetch_page returns
+them) three ways:
+
+1. default: per-row ItemResponse construction, FastAPI's response_model
+   pass (serialize_response) and JSONResponse, as GET /menu/items does today
+2. default + ORJSONResponse as the response class
+3. FastListSerializer: one TypeAdapter validate + dump_json pass
+   (FAST_JSON_RESPONSES=true)
+
+All three must produce the same JSON document.
+"""
+import asyncio
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.routes.menu import ItemResponse, _item_response, item_list
+
+ITEMS = 5000
+
+
+def make_docs(n):
+    return [
+        {"_id": f"mi{i}", "group_id": f"mg{i % 12}", "restaurant_id": "rest_001", "name": f"Item {i}",
+         "description": "House special with a reasonably long description" if i % 3 else None,
+         "price": 50.0 + i % 400, "image_url": f"https://img.example/{i}.jpg", "is_available": i % 7 != 0}
+        for i in range(n)
+    ]
+
+
+field = create_response_field(name="response", type_=List[ItemResponse])
+
+
+def default_path(docs, response_class):
+    content = [_item_response(doc) for doc in docs]
+    value = asyncio.run(serialize_response(field=field, response_content=content, is_coroutine=True))
+    return response_class(value).body
+
+
+def fast_path(docs):
+    return item_list.dump(docs)
+
+
+if __name__ == "__main__":
+    docs = make_docs(ITEMS)
+    outputs = [default_path(docs, JSONResponse), default_path(docs, ORJSONResponse), fast_path(docs)]
+    same = all(json.loads(o) == json.loads(outputs[0]) for o in outputs)
+    print(f"Identical output: {'OK' if same else 'FAIL'}  ({len(outputs[2]) / 1024:.0f} KiB)")
+
+    number = 20
+    timings = [
+        ("models + response_model + JSONResponse", lambda: default_path(docs, JSONResponse)),
+        ("models + response_model + ORJSONResponse", lambda: default_path(docs, ORJSONResponse)),
+        ("TypeAdapter dump_json (fast path)", lambda: fast_path(docs)),
+    ]
+    base = None
+    print(f"Serializing {ITEMS} menu items:")
+    for label, fn in timings:
+        seconds = timeit.timeit(fn, number=number) / number
+        base = base or seconds
+        print(f"  {label:<42} {seconds * 1000:8.2f} ms  speedup={base / seconds:5.1f}x")
+
+    if not same:
+        sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Spinner sampler check and micro-benchmark.
+
+    cd backend && python scripts/bench_spinner.py
+
+1. Statistical check: seeded SpinnerSamplers are drawn many times and the
+   observed counts are compared against the configured probabilities with a
+   chi-square goodness-of-fit test. Exits non-zero on a bad distribution.
+2. Benchmark: the alias sampler vs the previous linear cumulative-sum loop
+   for wheels with a growing number of slots.
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.spinner import SpinnerSampler
+
+SEED = 1234
+
+
+def linear_draw(slots, rng):
+    """The previous spin_wheel loop, kept for comparison."""
+    rand = rng.uniform(0, 100)
+    cumulative = 0.0
+    for slot in slots:
+        cumulative += slot["probability"]
+        if rand <= cumulative:
+            return slot
+    return slots[-1]
+
+
+def make_wheel(n, rng):
+    weights = [rng.random() + 0.01 for _ in range(n)]
+    total = sum(weights)
+    return [{"label": f"slot {i}", "probability": w * 100 / total, "reward": None} for i, w in enumerate(weights)]
+
+
+def chi_square_critical(df, z=3.09):
+    """Wilson-Hilferty approximation of the chi-square quantile (z=3.09 ~ p=0.001)."""
+    return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+
+
+def check_distribution(slots, draws=200_000):
+    sampler = SpinnerSampler(slots, rng=random.Random(SEED))
+    index = {id(slot): i for i, slot in enumerate(slots)}
+    counts = [0] * len(slots)
+    for _ in range(draws):
+        counts[index[id(sampler.draw())]] += 1
+
+    stat = 0.0
+    for slot, observed in zip(slots, counts):
+        expected = draws * slot["probability"] / 100
+        stat += (observed - expected) ** 2 / expected
+    critical = chi_square_critical(len(slots) - 1)
+    ok = stat < critical
+    print(f"  {len(slots):>5} slots  chi2={stat:10.2f}  critical={critical:10.2f}  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_repeatable(slots, draws=1000):
+    a = SpinnerSampler(slots, rng=random.Random(SEED))
+    b = SpinnerSampler(slots, rng=random.Random(SEED))
+    ok = [a.draw()["label"] for _ in range(draws)] == [b.draw()["label"] for _ in range(draws)]
+    print(f"  seeded draws repeatable: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def benchmark(n, number=100_000):
+    rng = random.Random(SEED)
+    slots = make_wheel(n, rng)
+    sampler = SpinnerSampler(slots, rng=rng)
+    linear = timeit.timeit(lambda: linear_draw(slots, rng), number=number)
+    alias = timeit.timeit(sampler.draw, number=number)
+    print(f"  {n:>5} slots  linear={linear / number * 1e9:8.0f} ns  alias={alias / number * 1e9:8.0f} ns  "
+          f"speedup={linear / alias:5.1f}x")
+
+
+if __name__ == "__main__":
+    print("Distribution check (seeded):")
+    rng = random.Random(SEED)
+    ok = all([check_distribution(make_wheel(n, rng)) for n in (4, 16, 64)])
+    ok = check_repeatable(make_wheel(8, rng)) and ok
+
+    print("Draw cost per spin:")
+    for n in (4, 16, 64, 256, 1024):
+        benchmark(n)
+
+    if not ok:
+        sys.exit(1)
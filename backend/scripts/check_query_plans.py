@@ -0,0 +1,38 @@
+"""
+Fail if any route query is answered by a collection scan.
+
+    cd backend && python scripts/check_query_plans.py
+
+Ensures the index manifest, then runs explain() on every query listed in
+app.db.indexes.ROUTE_QUERIES. Exits non-zero on the first COLLSCAN so it can
+gate CI. Setting CHECK_QUERY_PLANS=true runs the same check at API startup.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.db.indexes import ROUTE_QUERIES, ensure_indexes, find_collscans
+
+
+async def main() -> int:
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+    try:
+        await ensure_indexes(db)
+        offenders = await find_collscans(db)
+    finally:
+        client.close()
+
+    for offender in offenders:
+        print(f"COLLSCAN: {offender}")
+    print(f"{len(ROUTE_QUERIES) - len(offenders)}/{len(ROUTE_QUERIES)} route queries use an index.")
+    return 1 if offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,235 @@
+"""
+Mixed-traffic load test for the SpinServe API.
+
+    cd backend
+    pip install -r requirements-dev.txt
+    python scripts/load_test.py --mock                          # in-memory Mongo stand-in
+    python scripts/load_test.py --mongo-url mongodb://localhost:27017   # local mongod
+    python scripts/load_test.py --mock --save scripts/baselines/mock.json
+    python scripts/load_test.py --mock --compare scripts/baselines/mock.json
+
+Boots app.main:app in-process (lifespan included) against a throwaway
+database seeded by scripts/seed_db.py plus a floor of open table sessions,
+then drives a dinner-rush mix with concurrent virtual users:
+
+    customers polling GET /sessions/{id}   servers calling add-items
+    customers winning the game and spinning   owners reading config / menu
+    owners editing menu items
+
+Prints throughput and p50/p95/p99 latency per route. --save writes the
+numbers as a JSON baseline; --compare fails (exit 1) when a route's p95 is
+more than --tolerance slower than the baseline, or when it returns more
+errors than the baseline recorded. Re-save the baseline from a clean run
+whenever the traffic mix or the routes it drives change. The in-memory stand-in has
+no network or storage cost, so compare only against baselines taken with
+the same backend.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument("--mock", action="store_true", help="use mongomock-motor in memory")
+    backend.add_argument("--mongo-url", help="local mongod to run against (a temporary database is used)")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of traffic")
+    parser.add_argument("--tables", type=int, default=40, help="open table sessions on the floor")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for the traffic mix")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 regression (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_NAME"] = f"spinserve_loadtest_{os.getpid()}"
+if args.mongo_url:
+    os.environ["MONGODB_URL"] = args.mongo_url
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+import httpx  # noqa: E402
+
+from app.db import mongodb  # noqa: E402
+
+if args.mock:
+    from mongomock_motor import AsyncMongoMockClient
+    mongodb.AsyncIOMotorClient = AsyncMongoMockClient
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from scripts.seed_db import seed_collections  # noqa: E402
+
+API = settings.API_V1_STR
+
+# Minted in-process: the run measures authorized traffic, not logins
+SERVER_AUTH = {"Authorization": "Bearer " + create_access_token(
+    {"sub": "s1", "name": "Load Server", "role": "SERVER", "rid": "rest_001"})[0]}
+OWNER_AUTH = {"Authorization": "Bearer " + create_access_token(
+    {"sub": "o1", "name": "Load Owner", "role": "OWNER", "rid": "rest_001"})[0]}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, route, method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+
+async def seed_floor(db, tables: int):
+    """Open table sessions on top of the standard seed."""
+    await db.tables.delete_many({})
+    await db.dining_sessions.delete_many({})
+    await db.session_lines.delete_many({})
+    await db.tables.insert_many([
+        {"_id": f"lt_table_{i}", "restaurant_id": "rest_001", "table_number": i + 1,
+         "qr_code_id": f"QR_LT{i}", "current_session_id": f"lt_session_{i}"}
+        for i in range(tables)
+    ])
+    await db.dining_sessions.insert_many([
+        {"_id": f"lt_session_{i}", "restaurant_id": "rest_001", "table_id": f"lt_table_{i}",
+         "server_id": "s1", "item_counts": {}, "line_count": 0, "total_amount": 0.0, "game_status": "LOCKED",
+         "reward_won": None, "status": "OPEN"}
+        for i in range(tables)
+    ])
+
+
+async def virtual_user(client, db, recorder, rng, deadline, sessions, menu_ids, playing):
+    scenarios = ["poll", "add_items", "spin", "config", "menu", "edit_menu"]
+    weights = [55, 20, 5, 8, 8, 4]
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(scenarios, weights)[0]
+        session_id = rng.choice(sessions)
+        if scenario == "poll":
+            await recorder.call(client, "GET /sessions/{id}", "GET", f"{API}/sessions/{session_id}")
+        elif scenario == "add_items":
+            items = [{"menu_item_id": rng.choice(menu_ids), "quantity": rng.randint(1, 3)}]
+            await recorder.call(client, "POST /sessions/{id}/add-items", "POST",
+                                f"{API}/sessions/{session_id}/add-items", json={"items": items},
+                                headers=SERVER_AUTH)
+        elif scenario == "spin":
+            if session_id in playing:
+                continue  # another user's game on this table; overlapping would only measure rejections
+            playing.add(session_id)
+            try:
+                # Put the table in a spinnable state without timing the setup
+                await db.dining_sessions.update_one({"_id": session_id},
+                                                    {"$set": {"game_status": "UNLOCKED", "reward_won": None}})
+                await recorder.call(client, "POST /sessions/{id}/game-won", "POST",
+                                    f"{API}/sessions/{session_id}/game-won")
+                await recorder.call(client, "POST /sessions/{id}/spin", "POST", f"{API}/sessions/{session_id}/spin")
+            finally:
+                playing.discard(session_id)
+        elif scenario == "config":
+            await recorder.call(client, "GET /restaurant/config", "GET", f"{API}/restaurant/config")
+        elif scenario == "menu":
+            await recorder.call(client, "GET /menu/items", "GET", f"{API}/menu/items")
+        else:
+            item_id = rng.choice(menu_ids)
+            await recorder.call(client, "PUT /menu/items/{id}", "PUT", f"{API}/menu/items/{item_id}",
+                                json={"price": float(rng.randint(50, 400))}, headers=OWNER_AUTH)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    results = {}
+    for route, values in sorted(recorder.latencies.items()):
+        values.sort()
+        results[route] = {
+            "requests": len(values),
+            "errors": recorder.errors[route],
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return results
+
+
+def print_report(results):
+    print(f"{'route':<34}{'reqs':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in results.items():
+        print(f"{route:<34}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["routes"]
+    failed = False
+    for route, base in baseline.items():
+        current = results.get(route)
+        if current is None:
+            print(f"MISSING  {route}")
+            failed = True
+            continue
+        limit = base["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit:
+            print(f"REGRESSED  {route}: p95 {current['p95_ms']}ms > {limit:.2f}ms (baseline {base['p95_ms']}ms)")
+            failed = True
+        if current["errors"] > base["errors"]:
+            print(f"ERRORS  {route}: {current['errors']} errors (baseline {base['errors']})")
+            failed = True
+    return not failed
+
+
+async def main():
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    async with app.router.lifespan_context(app):
+        db = mongodb.get_database()
+        await seed_collections(db)
+        await seed_floor(db, args.tables)
+        sessions = [f"lt_session_{i}" for i in range(args.tables)]
+        menu_ids = [doc["_id"] async for doc in db.menu_items.find({}, {"_id": 1})]
+        playing = set()  # sessions with a game-won / spin in flight
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                start = time.perf_counter()
+                deadline = start + args.duration
+                await asyncio.gather(*(
+                    virtual_user(client, db, recorder, random.Random(rng.random()), deadline, sessions, menu_ids, playing)
+                    for _ in range(args.users)
+                ))
+                elapsed = time.perf_counter() - start
+        finally:
+            await mongodb.db.client.drop_database(settings.DATABASE_NAME)
+
+    results = summarize(recorder, elapsed)
+    print_report(results)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"backend": "mock" if args.mock else "mongod", "users": args.users,
+                       "duration": args.duration, "routes": results}, f, indent=2)
+        print(f"Baseline written to {args.save}")
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,95 @@
+"""
+Move the `items` array of sessions created before session_lines into lines.
+
+    cd backend && python scripts/migrate_session_items.py
+    cd backend && python scripts/backfill_rollups.py     # then count them in the rollups
+
+Each legacy item becomes a session_lines document (in the matching monthly
+archive collection for archived sessions), and the session gets the
+item_counts / line_count aggregates the API now reads, in the same update
+that removes `items`. Line ids are derived from the session and item
+position, and the aggregate update only matches sessions that still have
+`items`, so the script can be stopped and re-run at any point. Legacy
+items predate the kitchen queue and are written as READY.
+"""
+import asyncio
+import hashlib
+import os
+import struct
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.db.indexes import ensure_indexes
+from app.services.session_archive import LINE_ARCHIVE_PREFIX, SESSION_ARCHIVE_PREFIX
+
+
+def legacy_line_id(session: dict, position: int) -> str:
+    """ObjectId-shaped and stamped with the session's creation, so legacy lines page before newer ones."""
+    created_at = session.get("created_at") or datetime.now(timezone.utc)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    digest = hashlib.sha1(str(session["_id"]).encode()).digest()[:5]
+    return str(ObjectId(struct.pack(">I", int(created_at.timestamp())) + digest + position.to_bytes(3, "big")))
+
+
+async def migrate(db: AsyncIOMotorDatabase, sessions: str, lines: str) -> int:
+    migrated = 0
+    async for session in db[sessions].find({"items": {"$exists": True}}):
+        items = session["items"] or []
+        docs = [{
+            "_id": legacy_line_id(session, position),
+            "session_id": session["_id"],
+            "restaurant_id": session["restaurant_id"],
+            "table_id": session["table_id"],
+            "server_id": session["server_id"],
+            "menu_item_id": item["menu_item_id"],
+            "name": item["name"],
+            "quantity": item["quantity"],
+            "price_per_item": item["price_per_item"],
+            "notes": item.get("notes"),
+            "kitchen_status": "READY",
+            "created_at": session.get("created_at") or datetime.now(timezone.utc),
+        } for position, item in enumerate(items)]
+        if docs:
+            await db[lines].bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                                       ordered=False)
+        counts = {}
+        for item in items:
+            counts[item["menu_item_id"]] = counts.get(item["menu_item_id"], 0) + item["quantity"]
+        # $inc, not $set: lines added through the API since the deploy are already counted
+        update = {"$unset": {"items": ""}}
+        if items:
+            update["$inc"] = {"line_count": len(items),
+                              **{f"item_counts.{item_id}": quantity for item_id, quantity in counts.items()}}
+        result = await db[sessions].update_one({"_id": session["_id"], "items": {"$exists": True}}, update)
+        migrated += result.modified_count
+    return migrated
+
+
+async def main() -> int:
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+    try:
+        await ensure_indexes(db)
+        names = await db.list_collection_names()
+        pairs = [("dining_sessions", "session_lines")] + [
+            (name, LINE_ARCHIVE_PREFIX + name[len(SESSION_ARCHIVE_PREFIX):])
+            for name in sorted(names) if name.startswith(SESSION_ARCHIVE_PREFIX)
+        ]
+        for sessions, lines in pairs:
+            migrated = await migrate(db, sessions, lines)
+            print(f"{sessions}: migrated {migrated} sessions")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
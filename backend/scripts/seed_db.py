@@ -1,18 +1,20 @@
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.indexes import ensure_indexes
+
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "spinservedb")
 
-async def seed_data():
-    client = AsyncIOMotorClient(MONGODB_URL)
-    db = client[DATABASE_NAME]
-    print(f"Connecting to {MONGODB_URL}...")
-
+async def seed_collections(db):
+    """Seed restaurant, staff and menu into `db` (also used by the load-test harness)."""
     # ── Restaurant ──────────────────────────────────────────────────────────
     restaurant = {
         "_id": "rest_001", "name": "SpinServe Premium", "address": "123 Gourmet Street",
@@ -128,6 +130,19 @@ async def seed_data():
     await db.menu_items.insert_many(items)
     print(f"Seeded {len(items)} menu items.")
 
+    # Invalidate menu snapshots and ETags built from the old menu, here and in
+    # any running worker (they trust a snapshot at or above menu_revision)
+    await db.menu_snapshots.drop()
+    await db.restaurants.update_one({"_id": "rest_001"}, {"$inc": {"menu_revision": 1}})
+
+    await ensure_indexes(db)
+    print("Indexes ensured.")
+
+async def seed_data():
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+    print(f"Connecting to {MONGODB_URL}...")
+    await seed_collections(db)
     client.close()
     print("✅ Seeding complete.")
 
@@ -3,6 +3,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
+from app.core.security import hash_password
+from app.db.indexes import ensure_indexes
 
 load_dotenv()
 
@@ -10,12 +12,16 @@ async def seed_database():
     client = AsyncIOMotorClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
     db = client[os.getenv("DATABASE_NAME", "spinservedb")]
     
+    # Kept across the reseed so menu revisions only ever move forward
+    previous = await db.restaurants.find_one({"_id": "rest_001"}, {"menu_revision": 1}) or {}
+
     # Drop existing collections for clean seed
     await db.users.drop()
     await db.restaurants.drop()
     await db.tables.drop()
     await db.menu_items.drop()
     await db.dining_sessions.drop()
+    await db.session_lines.drop()
 
     # 1. Create Owner & Staff
     owner_id = "user_owner_6374503440"
@@ -28,8 +34,9 @@ async def seed_database():
             "name": "Admin Owner",
             "email": "owner@spinserve.com",
             "mobile": "6374503440",
-            "hashed_password": "Abc@123", # Plain text for now as per current backend auth
+            "hashed_password": hash_password("Abc@123"),
             "role": "OWNER",
+            "restaurant_id": "rest_001",
             "created_at": datetime.now(timezone.utc)
         },
         {
@@ -37,8 +44,9 @@ async def seed_database():
             "name": "Chef Ramu",
             "email": "kitchen@spinserve.com",
             "mobile": "9999911111",
-            "hashed_password": "kitchen_password",
+            "hashed_password": hash_password("kitchen_password"),
             "role": "KITCHEN",
+            "restaurant_id": "rest_001",
             "created_at": datetime.now(timezone.utc)
         },
         {
@@ -46,8 +54,9 @@ async def seed_database():
             "name": "Kumar Server",
             "email": "server@spinserve.com",
             "mobile": "8888822222",
-            "hashed_password": "server_password",
+            "hashed_password": hash_password("server_password"),
             "role": "SERVER",
+            "restaurant_id": "rest_001",
             "created_at": datetime.now(timezone.utc)
         }
     ])
@@ -99,9 +108,6 @@ async def seed_database():
         "created_at": datetime.now(timezone.utc)
     })
 
-    # Update users with restaurant_id
-    await db.users.update_many({}, {"$set": {"restaurant_id": restaurant_id}})
-
     # 3. Create Menu Items
     menu_items = [
         {"_id": "item_001", "restaurant_id": restaurant_id, "name": "Parotta", "price": 20.0, "category": "Bread", "is_available": True},
@@ -111,6 +117,12 @@ async def seed_database():
     ]
     await db.menu_items.insert_many(menu_items)
 
+    # Invalidate menu snapshots and ETags built from the old menu, here and in
+    # any running worker (they trust a snapshot at or above menu_revision)
+    await db.menu_snapshots.drop()
+    await db.restaurants.update_one({"_id": restaurant_id},
+                                    {"$set": {"menu_revision": previous.get("menu_revision", 0) + 1}})
+
     # 4. Create Tables
     await db.tables.insert_many([
         {"_id": "table_001", "restaurant_id": restaurant_id, "table_number": 1, "qr_code_id": "QR_TBL1", "current_session_id": None},
@@ -124,15 +136,8 @@ async def seed_database():
         "restaurant_id": restaurant_id,
         "table_id": "table_003",
         "server_id": server_id,
-        "items": [
-            {
-                "menu_item_id": "item_001",
-                "name": "Parotta",
-                "quantity": 10,
-                "price_per_item": 20.0,
-                "notes": "Hot"
-            }
-        ],
+        "item_counts": {"item_001": 10},
+        "line_count": 1,
         "total_amount": 200.0,
         "game_status": "UNLOCKED", # Unlocked because 200 >= threshold 200
         "reward_won": None,
@@ -140,6 +145,22 @@ async def seed_database():
         "created_at": datetime.now(timezone.utc),
         "closed_at": None
     })
+    await db.session_lines.insert_one({
+        "_id": "line_001",
+        "session_id": "session_001",
+        "restaurant_id": restaurant_id,
+        "table_id": "table_003",
+        "server_id": server_id,
+        "menu_item_id": "item_001",
+        "name": "Parotta",
+        "quantity": 10,
+        "price_per_item": 20.0,
+        "notes": "Hot",
+        "kitchen_status": "PENDING",
+        "created_at": datetime.now(timezone.utc)
+    })
+
+    await ensure_indexes(db)
 
     print("Database Seeded Successfully!")
     client.close()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
-import api from '../services/api';
+import api, { postIdempotent } from '../services/api';
 import './CustomerView.css';
 
 const CustomerView: React.FC = () => {
@@ -20,22 +20,25 @@ const CustomerView: React.FC = () => {
 
     useEffect(() => {
         fetchSession();
-        const interval = setInterval(fetchSession, 5000);
-        return () => clearInterval(interval);
+        // Server pushes game_status / total_amount / reward_won changes as they happen
+        const stream = new EventSource(`${api.defaults.baseURL}/sessions/${sessionId}/stream`);
+        stream.onmessage = (e) => {
+            const changes = JSON.parse(e.data);
+            setSession((prev: any) => ({ ...prev, ...changes }));
+        };
+        return () => stream.close();
     }, [sessionId]);
 
     const handleWinPuzzle = async () => {
-        await api.post(`/sessions/${sessionId}/game-won`);
-        fetchSession();
+        await postIdempotent(`/sessions/${sessionId}/game-won`);
     };
 
     const handleSpin = async () => {
         setSpinning(true);
         setTimeout(async () => {
-            const { data } = await api.post(`/sessions/${sessionId}/spin`);
+            const { data } = await postIdempotent(`/sessions/${sessionId}/spin`);
             setResult(data.won_slot);
             setSpinning(false);
-            fetchSession();
         }, 3000);
     };
 
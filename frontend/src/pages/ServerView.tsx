@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import { fetchAllPages, postIdempotent } from '../services/api';
 import './ServerView.css';
 
 const ServerView: React.FC = () => {
@@ -9,8 +9,8 @@ const ServerView: React.FC = () => {
     const [quantity, setQuantity] = useState(1);
 
     const refreshData = async () => {
-        const { data: sess } = await api.get('/sessions');
-        const { data: menuItems } = await api.get('/restaurant/menu');
+        const sess = await fetchAllPages('/sessions/');
+        const menuItems = await fetchAllPages('/restaurant/menu');
         setSessions(sess);
         setMenu(menuItems);
     };
@@ -21,7 +21,7 @@ const ServerView: React.FC = () => {
 
     const addItem = async (sessionId: string) => {
         if (!selectedItem) return;
-        await api.post(`/sessions/${sessionId}/add-items`, {
+        await postIdempotent(`/sessions/${sessionId}/add-items`, {
             items: [{ menu_item_id: selectedItem, quantity }]
         });
         refreshData();
@@ -47,8 +47,8 @@ const ServerView: React.FC = () => {
                         <div className="order-summary">
                             <p className="total">₹ {session.total_amount}</p>
                             <ul>
-                                {session.items.map((item: any, idx: number) => (
-                                    <li key={idx}>{item.quantity}x {item.name}</li>
+                                {Object.entries(session.item_counts || {}).map(([itemId, count]) => (
+                                    <li key={itemId}>{count as number}x {menu.find(item => item._id === itemId)?.name || itemId}</li>
                                 ))}
                             </ul>
                         </div>
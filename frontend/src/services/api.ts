@@ -5,6 +5,60 @@ const api = axios.create({
     headers: { 'Content-Type': 'application/json' },
 });
 
+// Staff requests carry the signed token returned by /users/login
+const storedToken = (): string | undefined => {
+    try {
+        return JSON.parse(localStorage.getItem('user') || 'null')?.access_token;
+    } catch {
+        return undefined;
+    }
+};
+
+api.interceptors.request.use((config) => {
+    const token = storedToken();
+    if (token) config.headers.Authorization = `Bearer ${token}`;
+    return config;
+});
+
+api.interceptors.response.use(
+    (response) => response,
+    (error) => {
+        // Expired or rotated-out token: back to the login screen
+        if (error.response?.status === 401 && error.config?.headers?.Authorization) {
+            localStorage.removeItem('user');
+            window.location.assign('/login');
+        }
+        return Promise.reject(error);
+    }
+);
+
+// List endpoints are keyset-paginated: follow X-Next-Cursor until exhausted
+export const fetchAllPages = async (url: string, params: Record<string, string> = {}) => {
+    const rows: any[] = [];
+    let after: string | undefined;
+    do {
+        const r = await api.get(url, { params: { ...params, limit: 1000, ...(after ? { after } : {}) } });
+        rows.push(...r.data);
+        after = r.headers['x-next-cursor'];
+    } while (after);
+    return rows;
+};
+
+// One Idempotency-Key per user action, reused across retries: a request that
+// timed out on flaky Wi-Fi is replayed by the server instead of run twice
+export const postIdempotent = async (url: string, data?: any, attempts = 3) => {
+    const key = crypto.randomUUID();
+    for (let attempt = 1; ; attempt++) {
+        try {
+            return await api.post(url, data, { headers: { 'Idempotency-Key': key } });
+        } catch (error: any) {
+            const retryable = !error.response || error.response.status === 409;
+            if (!retryable || attempt >= attempts) throw error;
+            await new Promise((resolve) => setTimeout(resolve, 500 * attempt));
+        }
+    }
+};
+
 export const authAPI = {
     login: async (mobile: string, password: string) => {
         const response = await api.post('/users/login', { mobile, password });
@@ -13,22 +67,19 @@ export const authAPI = {
 };
 
 export const staffAPI = {
-    getAll: async () => { const r = await api.get('/staff/'); return r.data; },
+    getAll: async () => fetchAllPages('/staff/'),
     create: async (data: { name: string; mobile: string; role: string }) => { const r = await api.post('/staff/', data); return r.data; },
     update: async (id: string, data: { name?: string; mobile?: string }) => { const r = await api.put(`/staff/${id}`, data); return r.data; },
     delete: async (id: string) => { const r = await api.delete(`/staff/${id}`); return r.data; }
 };
 
 export const menuAPI = {
-    getGroups: async () => { const r = await api.get('/menu/groups'); return r.data; },
+    getGroups: async () => fetchAllPages('/menu/groups'),
     createGroup: async (data: { title: string; image_url?: string }) => { const r = await api.post('/menu/groups', data); return r.data; },
     deleteGroup: async (id: string) => { const r = await api.delete(`/menu/groups/${id}`); return r.data; },
 
-    getItems: async (groupId?: string) => {
-        const url = groupId ? `/menu/items?group_id=${groupId}` : '/menu/items';
-        const r = await api.get(url);
-        return r.data;
-    },
+    getItems: async (groupId?: string) => fetchAllPages('/menu/items', groupId ? { group_id: groupId } : {}),
+    getSnapshot: async () => { const r = await api.get('/menu/snapshot'); return r.data; },
     createItem: async (data: { group_id: string; name: string; description?: string; price: number; image_url?: string }) => {
         const r = await api.post('/menu/items', data);
         return r.data;
@@ -42,7 +93,9 @@ export const menuAPI = {
 
 export const restaurantAPI = {
     getConfig: async () => { const r = await api.get('/restaurant/config'); return r.data; },
-    updateConfig: async (data: any) => { const r = await api.put('/restaurant/config', data); return r.data; }
+    updateConfig: async (data: any) => { const r = await api.put('/restaurant/config', data); return r.data; },
+    getRevenue: async (period: 'hour' | 'day' = 'day') => { const r = await api.get('/restaurant/revenue', { params: { period } }); return r.data; },
+    getFloor: async () => { const r = await api.get('/restaurant/floor'); return r.data; }
 };
 
 export default api;